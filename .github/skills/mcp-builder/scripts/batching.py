@@ -0,0 +1,154 @@
+"""Lock-step batched model requests for evaluation runs.
+
+``BatchingClient`` stands in for an Anthropic client inside ``agent_loop``.
+Instead of sending each ``messages.create`` call on its own, it holds requests
+until every active task is waiting on the model, then submits them together as
+one batch. Tool calls still run concurrently between batches, so all active
+tasks advance one turn per batch.
+"""
+
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from typing import Any
+
+from clients import call_client
+
+
+class BatchRequestError(RuntimeError):
+    """Raised for a batched request that did not succeed."""
+
+
+class MessageBatchesBackend:
+    """Runs batches through the Message Batches API and polls until they end."""
+
+    def __init__(self, client: Any, poll_interval: float = 5.0):
+        self.client = client
+        self.poll_interval = poll_interval
+
+    async def run_batch(self, requests: list[tuple[str, dict[str, Any]]]) -> dict[str, Any]:
+        """Submit requests as one batch; map custom_id to a Message or an exception."""
+        batches = self.client.messages.batches
+        batch = await call_client(
+            self.client,
+            batches.create,
+            requests=[{"custom_id": custom_id, "params": params} for custom_id, params in requests],
+        )
+        while batch.processing_status != "ended":
+            await asyncio.sleep(self.poll_interval)
+            batch = await call_client(self.client, batches.retrieve, batch.id)
+
+        entries = await call_client(self.client, batches.results, batch.id)
+        if hasattr(entries, "__aiter__"):
+            entries = [entry async for entry in entries]
+        else:
+            entries = await asyncio.to_thread(list, entries)
+
+        results = {}
+        for entry in entries:
+            if entry.result.type == "succeeded":
+                results[entry.custom_id] = entry.result.message
+            else:
+                detail = getattr(entry.result, "error", None)
+                results[entry.custom_id] = BatchRequestError(f"Batch request {entry.custom_id} {entry.result.type}: {detail}")
+        return results
+
+
+class LocalBatchBackend:
+    """Stand-in batch endpoint that fulfils each request with messages.create.
+
+    Wrapping a replayed cassette client makes batch mode runnable offline.
+    """
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    async def run_batch(self, requests: list[tuple[str, dict[str, Any]]]) -> dict[str, Any]:
+        """Run every request of the batch concurrently."""
+        outcomes = await asyncio.gather(
+            *(call_client(self.client, self.client.messages.create, **params) for _, params in requests),
+            return_exceptions=True,
+        )
+        return {custom_id: outcome for (custom_id, _), outcome in zip(requests, outcomes)}
+
+
+class _BatchingMessages:
+    def __init__(self, batching_client: "BatchingClient"):
+        self._batching_client = batching_client
+
+    async def create(self, **params: Any) -> Any:
+        return await self._batching_client.submit(params)
+
+
+class BatchingClient:
+    """Client stand-in that gathers concurrent messages.create calls into lock-step batches.
+
+    Tasks register with ``track_task``. A batch is submitted once every tracked
+    task has a pending request (or ``max_batch_size`` is reached), so a task
+    busy with tool calls is waited for and joins the same batch.
+    """
+
+    def __init__(self, backend: Any, max_batch_size: int = 10000):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.messages = _BatchingMessages(self)
+        self.stats = {"batches": 0, "requests": 0, "largest_batch": 0}
+        self._pending: list[tuple[str, dict[str, Any], asyncio.Future]] = []
+        self._active = 0
+        self._ids = itertools.count(1)
+        self._batches: set[asyncio.Task] = set()
+        self._flush_scheduled = False
+
+    @asynccontextmanager
+    async def track_task(self):
+        """Count a task as active while it runs its agent loop."""
+        self._active += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._maybe_flush()
+
+    async def submit(self, params: dict[str, Any]) -> Any:
+        """Queue one request and wait for its batch to finish."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((f"req-{next(self._ids)}", params, future))
+        self._maybe_flush()
+        return await future
+
+    def _maybe_flush(self) -> None:
+        # Decide on the next loop iteration so tasks that became runnable at
+        # the same time can register and queue their requests first.
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush_if_ready)
+
+    def _flush_if_ready(self) -> None:
+        self._flush_scheduled = False
+        if not self._pending:
+            return
+        if len(self._pending) < self._active and len(self._pending) < self.max_batch_size:
+            return
+
+        pending, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+        batch = asyncio.create_task(self._run_batch(pending))
+        self._batches.add(batch)
+        batch.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, pending: list[tuple[str, dict[str, Any], asyncio.Future]]) -> None:
+        self.stats["batches"] += 1
+        self.stats["requests"] += len(pending)
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(pending))
+        try:
+            results = await self.backend.run_batch([(custom_id, params) for custom_id, params, _ in pending])
+        except Exception as e:
+            results = {custom_id: e for custom_id, _, _ in pending}
+
+        for custom_id, _, future in pending:
+            if future.done():
+                continue
+            outcome = results.get(custom_id, BatchRequestError(f"Batch request {custom_id} missing from batch results"))
+            if isinstance(outcome, BaseException):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
@@ -0,0 +1,117 @@
+"""Fake Anthropic Messages endpoint for benchmarking the evaluation harness.
+
+Answers ``POST /v1/messages`` with scripted responses. For the first
+``--tool-turns`` turns of a conversation it asks for ``--parallel-calls``
+``lookup`` tool calls; after that it answers with the value following
+``ANS=`` in the question, and its summary reports how many tool results
+came back with ``is_error`` set. Point the Anthropic SDK at it with
+``ANTHROPIC_BASE_URL=http://127.0.0.1:<port>``.
+
+Usage:
+    python bench_fake_model.py --port 8766 --latency 0.05 --tool-turns 3
+"""
+
+import argparse
+import json
+import re
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+ANSWER_PATTERN = re.compile(r"ANS=(\S+)")
+
+
+def scripted_response(request: dict[str, Any], tool_turns: int, parallel_calls: int, output_tokens: int) -> dict[str, Any]:
+    """Build the next assistant message for a conversation."""
+    messages = request["messages"]
+    question = messages[0]["content"]
+    if not isinstance(question, str):
+        question = " ".join(block.get("text", "") for block in question)
+    turn = sum(1 for message in messages if message["role"] == "assistant")
+    tool_errors = sum(
+        1
+        for message in messages
+        if message["role"] == "user" and isinstance(message["content"], list)
+        for block in message["content"]
+        if block.get("type") == "tool_result" and block.get("is_error")
+    )
+
+    if turn < tool_turns:
+        key = f"q{zlib.crc32(question.encode()):08x}"
+        content = [
+            {"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:20]}", "name": "lookup", "input": {"key": f"{key}-{call}", "hop": turn}}
+            for call in range(parallel_calls)
+        ]
+        stop_reason = "tool_use"
+    else:
+        match = ANSWER_PATTERN.search(question)
+        answer = match.group(1) if match else "unknown"
+        content = [{
+            "type": "text",
+            "text": (
+                f"<summary>Called lookup {tool_turns * parallel_calls} times; {tool_errors} returned errors.</summary>"
+                f"<feedback>Scripted benchmark response.</feedback><response>{answer}</response>"
+            ),
+        }]
+        stop_reason = "end_turn"
+
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": request.get("model", "fake"),
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": len(json.dumps(messages)) // 4, "output_tokens": output_tokens},
+    }
+
+
+def make_handler(latency: float, tool_turns: int, parallel_calls: int, output_tokens: int) -> type[BaseHTTPRequestHandler]:
+    """Create a request handler class bound to the scripted behaviour."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path.split("?")[0] != "/v1/messages":
+                self.send_error(404)
+                return
+            if latency:
+                time.sleep(latency)
+            payload = json.dumps(scripted_response(json.loads(body), tool_turns, parallel_calls, output_tokens)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Anthropic Messages endpoint for harness benchmarks")
+    parser.add_argument("--port", type=int, default=8766, help="Port to listen on (default: 8766)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds each model response takes (default: 0)")
+    parser.add_argument("--tool-turns", type=int, default=3, help="Turns of tool calls before answering (default: 3)")
+    parser.add_argument("--parallel-calls", type=int, default=2, help="Tool calls requested per turn (default: 2)")
+    parser.add_argument("--output-tokens", type=int, default=50, help="Output tokens reported per response (default: 50)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", args.port),
+        make_handler(args.latency, args.tool_turns, args.parallel_calls, args.output_tokens),
+    )
+    server.daemon_threads = True
+    print(f"Fake messages endpoint listening on http://127.0.0.1:{args.port}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Stub MCP server for benchmarking the evaluation harness.
+
+Serves a single ``lookup`` tool over stdio or streamable HTTP. Its latency,
+result size and error rate are configurable, so the harness can be measured
+without a real backend.
+
+Usage:
+    python bench_stub_server.py --latency 0.01 --result-size 2048
+    python bench_stub_server.py --transport http --port 8765 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+
+def build_server(
+    latency: float = 0.0,
+    result_size: int = 256,
+    error_rate: float = 0.0,
+    blocking: bool = False,
+    seed: int | None = None,
+    port: int = 8765,
+) -> FastMCP:
+    """Create the stub server with a configured ``lookup`` tool."""
+    mcp = FastMCP("bench_stub", port=port, log_level="WARNING")
+    rng = random.Random(seed)
+
+    @mcp.tool()
+    async def lookup(key: str, hop: int = 0) -> str:
+        """Look up a key and return a fixed-size payload."""
+        if blocking:
+            time.sleep(latency)
+        elif latency:
+            await asyncio.sleep(latency)
+        if error_rate and rng.random() < error_rate:
+            raise RuntimeError(f"Injected failure for {key} (hop {hop})")
+        prefix = f"{key}:{hop}:"
+        return prefix + "x" * max(0, result_size - len(prefix))
+
+    return mcp
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub MCP server for harness benchmarks")
+    parser.add_argument("--transport", choices=["stdio", "http"], default="stdio", help="Transport to serve (default: stdio)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the http transport (default: 8765)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds each tool call takes (default: 0)")
+    parser.add_argument("--result-size", type=int, default=256, help="Bytes of text each tool call returns (default: 256)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of tool calls that fail (default: 0)")
+    parser.add_argument("--blocking", action="store_true", help="Block the server while sleeping, like a single-threaded server")
+    parser.add_argument("--seed", type=int, help="Random seed for injected failures")
+    args = parser.parse_args()
+
+    mcp = build_server(
+        latency=args.latency,
+        result_size=args.result_size,
+        error_rate=args.error_rate,
+        blocking=args.blocking,
+        seed=args.seed,
+        port=args.port,
+    )
+    mcp.run(transport="streamable-http" if args.transport == "http" else "stdio")
+
+
+if __name__ == "__main__":
+    main()
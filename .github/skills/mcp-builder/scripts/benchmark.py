@@ -0,0 +1,332 @@
+"""Offline benchmark of the evaluation harness itself.
+
+Runs ``run_evaluation`` against a stub MCP server (``bench_stub_server.py``)
+and a fake Messages endpoint (``bench_fake_model.py``), so no API key or real
+server is needed and the numbers reflect the overhead of ``evaluation.py`` and
+``connections.py``. Every combination of transport, client and concurrency
+runs in a fresh process and reports tasks/sec, harness CPU per model turn and
+peak memory. A run without ``--error-rate`` fails if any tool call returned an
+error, so a broken harness cannot pass by timing its error path. With
+``--baseline`` the run fails when any of these regress by more than
+``--tolerance``.
+
+Usage:
+    python benchmark.py --output bench.json
+    python benchmark.py --baseline bench.json --tolerance 0.15
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import contextlib
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Iterator
+from xml.sax.saxutils import escape
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+STUB_SERVER = SCRIPTS_DIR / "bench_stub_server.py"
+FAKE_MODEL = SCRIPTS_DIR / "bench_fake_model.py"
+
+CONFIG_KEYS = ("transport", "client", "concurrency")
+
+# Reported in each task summary by bench_fake_model.py.
+TOOL_ERRORS_PATTERN = re.compile(r"(\d+) returned errors")
+
+# Direction in which each gated metric gets worse.
+GATED_METRICS = {
+    "tasks_per_sec": "lower",
+    "cpu_ms_per_turn": "higher",
+    "peak_rss_mb": "higher",
+}
+
+TABLE_HEADER = """| Transport | Client | Concurrency | Tasks/s | CPU ms/turn | Peak RSS MB | Accuracy |
+|-----------|--------|-------------|---------|-------------|-------------|----------|"""
+
+
+def write_eval_file(path: Path, tasks: int) -> None:
+    """Write an evaluation file whose answers the fake model can read from each question."""
+    pairs = "".join(
+        f"   <qa_pair>\n"
+        f"      <question>{escape(f'Benchmark question {i}: look up record {i}. ANS={i}')}</question>\n"
+        f"      <answer>{i}</answer>\n"
+        f"   </qa_pair>\n"
+        for i in range(tasks)
+    )
+    path.write_text(f"<evaluation>\n{pairs}</evaluation>\n")
+
+
+def free_port() -> int:
+    """Pick an unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    """Wait until a helper process accepts connections on ``port``."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args[1]} exited with code {process.returncode}")
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), timeout=0.5):
+            return
+        time.sleep(0.1)
+    raise TimeoutError(f"{process.args[1]} did not listen on port {port} within {timeout}s")
+
+
+@contextlib.contextmanager
+def helper_process(script: Path, port: int, *args: str) -> Iterator[None]:
+    """Run a helper server for the duration of the benchmark."""
+    process = subprocess.Popen(
+        [sys.executable, str(script), "--port", str(port), *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port, process)
+        yield
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def stub_server_args(args: argparse.Namespace) -> list[str]:
+    """Stub server options shared by the stdio and http transports."""
+    server_args = [
+        "--latency", str(args.tool_latency),
+        "--result-size", str(args.result_size),
+        "--error-rate", str(args.error_rate),
+        "--seed", "0",
+    ]
+    if args.blocking_server:
+        server_args.append("--blocking")
+    return server_args
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_config(config: dict[str, Any]) -> dict[str, Any]:
+    """Run one benchmark configuration; called in a fresh process per configuration."""
+    os.environ["ANTHROPIC_BASE_URL"] = config["model_url"]
+    os.environ["ANTHROPIC_API_KEY"] = "benchmark"
+
+    # Import the heavy packages up front so their cost is not counted per turn.
+    import mcp.client.stdio  # noqa: F401
+    import mcp.client.streamable_http  # noqa: F401
+    from anthropic import Anthropic
+
+    from connections import create_connection
+    from evaluation import ResultSink, create_async_client, run_evaluation
+    from metrics import MetricsCollector
+
+    if config["client"] == "async":
+        client = create_async_client(max_connections=max(100, config["concurrency"]))
+    else:
+        client = Anthropic()
+
+    if config["transport"] == "stdio":
+        connection = create_connection("stdio", command=sys.executable, args=[str(STUB_SERVER), *config["server_args"]])
+    else:
+        connection = create_connection("http", url=config["mcp_url"])
+
+    metrics = MetricsCollector()
+    with tempfile.TemporaryDirectory(prefix="mcp-bench-") as tmp:
+        sink = ResultSink(Path(tmp) / "results.jsonl")
+
+        async def run() -> None:
+            async with connection:
+                await run_evaluation(
+                    config["eval_path"], connection, "benchmark-model",
+                    concurrency=config["concurrency"], client=client, sink=sink, metrics=metrics,
+                )
+            if config["client"] == "async":
+                await client.close()
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            asyncio.run(run())
+            cpu = time.process_time() - cpu_start
+            wall = time.perf_counter() - wall_start
+
+        results = [result for _, result in sink.read_results()]
+
+    tool_errors = 0
+    for result in results:
+        match = TOOL_ERRORS_PATTERN.search(result["summary"] or "")
+        tool_errors += int(match.group(1)) if match else 0
+    if tool_errors and not config["error_rate"]:
+        raise RuntimeError(f"{tool_errors} tool calls returned errors without --error-rate; the benchmark would time the error path")
+
+    turns = len(metrics.phases["model"])
+    return {
+        **{key: config[key] for key in CONFIG_KEYS},
+        "tasks": len(results),
+        "turns": turns,
+        "tool_errors": tool_errors,
+        "wall_s": wall,
+        "tasks_per_sec": len(results) / wall if wall else 0.0,
+        "cpu_ms_per_turn": cpu * 1000 / turns if turns else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "accuracy": sum(result["score"] for result in results) / len(results) if results else 0.0,
+    }
+
+
+def run_benchmarks(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Start the helper servers and run every configuration in its own process."""
+    results = []
+    server_args = stub_server_args(args)
+    model_port = free_port()
+    mcp_port = free_port()
+
+    with contextlib.ExitStack() as stack:
+        tmp = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="mcp-bench-")))
+        eval_path = tmp / "benchmark.xml"
+        write_eval_file(eval_path, args.tasks)
+
+        stack.enter_context(helper_process(
+            FAKE_MODEL, model_port,
+            "--latency", str(args.model_latency),
+            "--tool-turns", str(args.tool_turns),
+            "--parallel-calls", str(args.parallel_calls),
+        ))
+        if "http" in args.transports:
+            stack.enter_context(helper_process(STUB_SERVER, mcp_port, "--transport", "http", *server_args))
+
+        context = multiprocessing.get_context("spawn")
+        for transport, client, concurrency in itertools.product(args.transports, args.clients, args.concurrency):
+            config = {
+                "transport": transport,
+                "client": client,
+                "concurrency": concurrency,
+                "eval_path": eval_path,
+                "model_url": f"http://127.0.0.1:{model_port}",
+                "mcp_url": f"http://127.0.0.1:{mcp_port}/mcp",
+                "server_args": server_args,
+                "error_rate": args.error_rate,
+            }
+            print(f"⏱️  {transport} / {client} client / concurrency {concurrency}...", flush=True)
+            # A fresh process per configuration keeps peak memory and imports separate.
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                results.append(executor.submit(run_config, config).result())
+
+    return results
+
+
+def format_table(results: list[dict[str, Any]]) -> str:
+    """Render benchmark results as a Markdown table."""
+    rows = [
+        f"| {r['transport']} | {r['client']} | {r['concurrency']} | {r['tasks_per_sec']:.2f} "
+        f"| {r['cpu_ms_per_turn']:.2f} | {r['peak_rss_mb']:.1f} | {r['accuracy'] * 100:.0f}% |"
+        for r in results
+    ]
+    return "\n".join([TABLE_HEADER, *rows])
+
+
+def find_regressions(
+    results: list[dict[str, Any]],
+    baseline: list[dict[str, Any]],
+    tolerance: float,
+) -> list[str]:
+    """Compare results with a baseline run and describe every regression beyond ``tolerance``."""
+    baseline_by_config = {tuple(entry[key] for key in CONFIG_KEYS): entry for entry in baseline}
+    regressions = []
+    for result in results:
+        config = tuple(result[key] for key in CONFIG_KEYS)
+        previous = baseline_by_config.get(config)
+        if previous is None:
+            continue
+        label = "/".join(str(value) for value in config)
+        for metric, worse in GATED_METRICS.items():
+            old, new = previous[metric], result[metric]
+            limit = old * (1 - tolerance) if worse == "lower" else old * (1 + tolerance)
+            if (new < limit) if worse == "lower" else (new > limit):
+                regressions.append(f"{label}: {metric} {old:.2f} -> {new:.2f} (limit {limit:.2f})")
+        if result["accuracy"] < previous["accuracy"]:
+            regressions.append(f"{label}: accuracy {previous['accuracy']:.2f} -> {result['accuracy']:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the evaluation harness offline against a stub MCP server and a fake model endpoint",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Record a baseline
+  python benchmark.py --output bench-baseline.json
+
+  # Fail if tasks/sec, CPU per turn or peak memory regress by more than 15%
+  python benchmark.py --baseline bench-baseline.json --tolerance 0.15
+        """,
+    )
+
+    matrix_group = parser.add_argument_group("benchmark matrix")
+    matrix_group.add_argument("--transports", nargs="+", choices=["stdio", "http"], default=["stdio", "http"], help="MCP transports to benchmark (default: stdio http)")
+    matrix_group.add_argument("--clients", nargs="+", choices=["sync", "async"], default=["async"], help="Anthropic clients to benchmark (default: async)")
+    matrix_group.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32], help="Task concurrency levels (default: 1 8 32)")
+    matrix_group.add_argument("--tasks", type=int, default=40, help="Number of evaluation tasks per run (default: 40)")
+
+    workload_group = parser.add_argument_group("workload options")
+    workload_group.add_argument("--tool-turns", type=int, default=3, help="Turns of tool calls per task (default: 3)")
+    workload_group.add_argument("--parallel-calls", type=int, default=2, help="Tool calls per turn (default: 2)")
+    workload_group.add_argument("--model-latency", type=float, default=0.02, help="Seconds per fake model response (default: 0.02)")
+    workload_group.add_argument("--tool-latency", type=float, default=0.005, help="Seconds per stub tool call (default: 0.005)")
+    workload_group.add_argument("--result-size", type=int, default=1024, help="Bytes per tool result (default: 1024)")
+    workload_group.add_argument("--error-rate", type=float, default=0.0, help="Fraction of failing tool calls (default: 0)")
+    workload_group.add_argument("--blocking-server", action="store_true", help="Make the stub server block while sleeping, like a single-threaded server")
+
+    output_group = parser.add_argument_group("output options")
+    output_group.add_argument("-o", "--output", type=Path, help="Write results as JSON (usable as a later --baseline)")
+    output_group.add_argument("--baseline", type=Path, help="Compare against a previous --output file and exit 1 on regressions")
+    output_group.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression per metric (default: 0.15)")
+
+    args = parser.parse_args()
+
+    workload = {
+        key: getattr(args, key)
+        for key in ("tasks", "tool_turns", "parallel_calls", "model_latency", "tool_latency", "result_size", "error_rate", "blocking_server")
+    }
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    if baseline and baseline["workload"] != workload:
+        print("Warning: baseline was recorded with a different workload; comparisons may not be meaningful")
+
+    results = run_benchmarks(args)
+    print("\n" + format_table(results))
+
+    if args.output:
+        args.output.write_text(json.dumps({"workload": workload, "results": results}, indent=2))
+        print(f"\n✅ Results saved to {args.output}")
+
+    if baseline:
+        regressions = find_regressions(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressions beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
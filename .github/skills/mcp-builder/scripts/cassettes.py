@@ -0,0 +1,148 @@
+"""Record/replay cassettes for offline, deterministic evaluation runs.
+
+A cassette is a directory holding every model request/response pair and every
+tool call result of a run, keyed by a hash of the request content. Replaying a
+cassette needs neither a model endpoint nor an MCP server.
+"""
+
+import hashlib
+import json
+import traceback
+from pathlib import Path
+from typing import Any
+
+from clients import call_client
+from connections import ToolError, to_jsonable
+from storage import write_atomic
+
+
+def request_key(payload: Any) -> str:
+    """Hash request content into a stable cassette key."""
+    canonical = json.dumps(to_jsonable(payload), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class ToolCallError(Exception):
+    """A tool call failure that carries its formatted traceback.
+
+    Recording and replaying raise the same error text and traceback, so the
+    tool_result content sent to the model is identical in both modes.
+    """
+
+    def __init__(self, message: str, formatted_traceback: str):
+        super().__init__(message)
+        self.formatted_traceback = formatted_traceback
+
+
+class Cassette:
+    """On-disk store of recorded model responses and tool results."""
+
+    def __init__(self, directory: Path, replay: bool = False):
+        self.directory = Path(directory)
+        self.replay = replay
+        self._entries: dict[str, dict[str, Any]] = {"messages": {}, "tools": {}, "list_tools": {}}
+
+        if replay:
+            if not self.directory.is_dir():
+                raise FileNotFoundError(f"Cassette directory not found: {self.directory}")
+            for kind, entries in self._entries.items():
+                for path in (self.directory / kind).glob("*.json"):
+                    entries[path.stem] = json.loads(path.read_text())
+        else:
+            for kind in self._entries:
+                (self.directory / kind).mkdir(parents=True, exist_ok=True)
+
+    def load(self, kind: str, key: str) -> Any:
+        """Return a recorded entry, preloaded into memory when the cassette was opened."""
+        try:
+            return self._entries[kind][key]
+        except KeyError:
+            raise CassetteMissError(f"No recorded {kind} entry {key} in cassette {self.directory}") from None
+
+    def save(self, kind: str, key: str, value: Any) -> None:
+        """Write an entry to the cassette."""
+        self._entries[kind][key] = value
+        write_atomic(self.directory / kind / f"{key}.json", json.dumps(value).encode())
+
+
+class _CassetteMessages:
+    def __init__(self, client: Any, cassette: Cassette):
+        self._client = client
+        self._cassette = cassette
+
+    async def create(self, **kwargs: Any) -> Any:
+        key = request_key(kwargs)
+        if self._cassette.replay:
+            from anthropic.types import Message
+
+            return Message.model_validate(self._cassette.load("messages", key))
+
+        response = await call_client(self._client, self._client.messages.create, **kwargs)
+        self._cassette.save("messages", key, to_jsonable(response))
+        return response
+
+
+class CassetteClient:
+    """Anthropic client wrapper that records or replays messages.create calls.
+
+    ``client`` may be a sync or async Anthropic client, or ``None`` when
+    replaying.
+    """
+
+    def __init__(self, client: Any, cassette: Cassette):
+        self.client = client
+        self.messages = _CassetteMessages(client, cassette)
+
+
+class CassetteConnection:
+    """MCP connection wrapper that records or replays list_tools and call_tool."""
+
+    def __init__(self, connection: Any, cassette: Cassette):
+        self.connection = connection
+        self.cassette = cassette
+
+    async def __aenter__(self):
+        if self.connection is not None:
+            await self.connection.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.connection is not None:
+            return await self.connection.__aexit__(exc_type, exc_val, exc_tb)
+
+    async def list_tools(self) -> list[dict[str, Any]]:
+        """Retrieve recorded tools, or fetch and record them."""
+        if self.cassette.replay:
+            return self.cassette.load("list_tools", "tools")
+
+        tools = to_jsonable(await self.connection.list_tools())
+        self.cassette.save("list_tools", "tools", tools)
+        return tools
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any]) -> Any:
+        """Replay a recorded tool result, or call the tool and record its result."""
+        key = request_key({"tool": tool_name, "arguments": arguments})
+        if self.cassette.replay:
+            entry = self.cassette.load("tools", key)
+            if "tool_error" in entry:
+                raise ToolError(entry["tool_error"])
+            if "error" in entry:
+                raise ToolCallError(entry["error"], entry["traceback"])
+            return entry["result"]
+
+        try:
+            result = await self.connection.call_tool(tool_name, arguments)
+        except ToolError as e:
+            self.cassette.save("tools", key, {"tool_error": e.content})
+            raise
+        except Exception as e:
+            formatted_traceback = traceback.format_exc()
+            self.cassette.save("tools", key, {"error": str(e), "traceback": formatted_traceback})
+            raise ToolCallError(str(e), formatted_traceback) from e
+
+        self.cassette.save("tools", key, {"result": result})
+        return result
@@ -0,0 +1,23 @@
+"""Helpers for calling sync and async Anthropic clients from async code.
+
+``anthropic`` is never imported here, so replay runs that never create a
+real client do not pay for it.
+"""
+
+import asyncio
+import inspect
+import sys
+from typing import Any, Callable
+
+
+def is_async_client(client: Any) -> bool:
+    """Whether ``client`` is an ``AsyncAnthropic`` client, without importing anthropic."""
+    anthropic = sys.modules.get("anthropic")
+    return anthropic is not None and isinstance(client, anthropic.AsyncAnthropic)
+
+
+async def call_client(client: Any, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call a method of ``client``, awaiting async clients and coroutine methods and running sync ones in a thread."""
+    if is_async_client(client) or inspect.iscoroutinefunction(method):
+        return await method(*args, **kwargs)
+    return await asyncio.to_thread(method, *args, **kwargs)
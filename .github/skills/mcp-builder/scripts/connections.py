@@ -1,13 +1,31 @@
-"""Lightweight connection handling for MCP servers."""
+"""Lightweight connection handling for MCP servers.
 
+The ``mcp`` package is imported when a connection is opened rather than at
+module load, so replay runs and worker bookkeeping never pay for it.
+"""
+
+import asyncio
+import fnmatch
+import hashlib
+import json
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from contextlib import AsyncExitStack
-from typing import Any
+from pathlib import Path
+from typing import Any, Callable
+
+from storage import write_atomic
+
+
+class ToolError(Exception):
+    """A tool call the MCP server answered with ``isError`` set.
 
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.sse import sse_client
-from mcp.client.stdio import stdio_client
-from mcp.client.streamable_http import streamablehttp_client
+    ``content`` holds the result content; the message is its text.
+    """
+
+    def __init__(self, content: list[dict[str, Any]]):
+        super().__init__("\n".join(block.get("text", "") for block in content if block.get("type") == "text"))
+        self.content = content
 
 
 class MCPConnection(ABC):
@@ -23,6 +41,8 @@ class MCPConnection(ABC):
 
     async def __aenter__(self):
         """Initialize MCP server connection."""
+        from mcp import ClientSession
+
         self._stack = AsyncExitStack()
         await self._stack.__aenter__()
 
@@ -65,9 +85,15 @@ class MCPConnection(ABC):
         ]
 
     async def call_tool(self, tool_name: str, arguments: dict[str, Any]) -> Any:
-        """Call a tool on the MCP server with provided arguments."""
+        """Call a tool on the MCP server and return its content as plain JSON-compatible data.
+
+        Raises ToolError if the server reports the call as failed.
+        """
         result = await self.session.call_tool(tool_name, arguments=arguments)
-        return result.content
+        content = to_jsonable(result.content)
+        if result.isError:
+            raise ToolError(content)
+        return content
 
 
 class MCPConnectionStdio(MCPConnection):
@@ -80,6 +106,9 @@ class MCPConnectionStdio(MCPConnection):
         self.env = env
 
     def _create_context(self):
+        from mcp import StdioServerParameters
+        from mcp.client.stdio import stdio_client
+
         return stdio_client(
             StdioServerParameters(command=self.command, args=self.args, env=self.env)
         )
@@ -94,6 +123,8 @@ class MCPConnectionSSE(MCPConnection):
         self.headers = headers or {}
 
     def _create_context(self):
+        from mcp.client.sse import sse_client
+
         return sse_client(url=self.url, headers=self.headers)
 
 
@@ -106,6 +137,8 @@ class MCPConnectionHTTP(MCPConnection):
         self.headers = headers or {}
 
     def _create_context(self):
+        from mcp.client.streamable_http import streamablehttp_client
+
         return streamablehttp_client(url=self.url, headers=self.headers)
 
 
@@ -149,3 +182,308 @@ def create_connection(
 
     else:
         raise ValueError(f"Unsupported transport type: {transport}. Use 'stdio', 'sse', or 'http'")
+
+
+class _PoolMember:
+    """One pooled connection, owned by its own task from start to close."""
+
+    def __init__(self, connection: MCPConnection):
+        self.connection = connection
+        self.in_flight = 0
+        self.ready = asyncio.get_running_loop().create_future()
+        self.closing = asyncio.Event()
+        self.dead = False
+        self.task: asyncio.Task | None = None
+
+
+class MCPConnectionPool:
+    """Pool of MCP sessions to one server, with the same API as ``MCPConnection``.
+
+    ``factory`` returns a new unopened connection (e.g. a ``create_connection``
+    call), so any transport can be pooled; for stdio every session is its own
+    server process. Calls go to the session with the fewest calls in flight.
+    A session whose call fails and that no longer answers a ping, or that
+    fails a periodic health check, is closed and replaced, and the failed call
+    is retried once on another session.
+
+    Each connection is opened and closed inside its own task because the MCP
+    transports must be exited from the task that entered them.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], MCPConnection],
+        size: int = 4,
+        health_check_interval: float | None = 30.0,
+        ping_timeout: float = 5.0,
+    ):
+        self.factory = factory
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.ping_timeout = ping_timeout
+        self.stats = {"calls": 0, "replaced": 0, "retried": 0}
+        self._members: list[_PoolMember] = []
+        self._retired: list[asyncio.Task] = []
+        self._health_task: asyncio.Task | None = None
+
+    async def __aenter__(self):
+        """Open all sessions concurrently."""
+        self._members = [self._start_member() for _ in range(self.size)]
+        try:
+            await asyncio.gather(*(member.ready for member in self._members))
+        except BaseException:
+            await self._close_members()
+            raise
+        if self.health_check_interval:
+            self._health_task = asyncio.create_task(self._health_loop())
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Stop health checks and close every session."""
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        await self._close_members()
+
+    def _start_member(self) -> _PoolMember:
+        member = _PoolMember(self.factory())
+        member.task = asyncio.create_task(self._run_member(member))
+        return member
+
+    async def _run_member(self, member: _PoolMember) -> None:
+        try:
+            async with member.connection:
+                member.ready.set_result(None)
+                await member.closing.wait()
+        except Exception as e:
+            if not member.ready.done():
+                member.ready.set_exception(e)
+        finally:
+            member.dead = True
+
+    async def _close_members(self) -> None:
+        for member in self._members:
+            member.closing.set()
+        await asyncio.gather(*(member.task for member in self._members), *self._retired, return_exceptions=True)
+        for member in self._members:
+            if member.ready.done() and not member.ready.cancelled():
+                member.ready.exception()
+        self._members = []
+        self._retired = []
+
+    async def _is_healthy(self, member: _PoolMember) -> bool:
+        if member.dead or member.connection.session is None:
+            return False
+        try:
+            await asyncio.wait_for(member.connection.session.send_ping(), self.ping_timeout)
+        except Exception:
+            return False
+        return True
+
+    def _replace(self, member: _PoolMember) -> None:
+        if member not in self._members:
+            return
+        member.closing.set()
+        self._retired.append(member.task)
+        self._members[self._members.index(member)] = self._start_member()
+        self.stats["replaced"] += 1
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            members = [member for member in self._members if member.ready.done() and member.in_flight == 0]
+            healthy = await asyncio.gather(*(self._is_healthy(member) for member in members))
+            for member, ok in zip(members, healthy):
+                if not ok:
+                    self._replace(member)
+
+    async def _acquire(self) -> _PoolMember:
+        ready = [member for member in self._members if member.ready.done() and not member.dead]
+        member = min(ready or self._members, key=lambda member: member.in_flight)
+        try:
+            await member.ready
+        except Exception:
+            self._replace(member)
+            raise
+        member.in_flight += 1
+        return member
+
+    async def _run(self, method: str, *args: Any) -> Any:
+        for attempt in range(2):
+            member = await self._acquire()
+            try:
+                return await getattr(member.connection, method)(*args)
+            except ToolError:
+                # The session answered, so it is healthy and the call is not retried
+                raise
+            except Exception:
+                if attempt or await self._is_healthy(member):
+                    raise
+                self._replace(member)
+                self.stats["retried"] += 1
+            finally:
+                member.in_flight -= 1
+
+    async def list_tools(self) -> list[dict[str, Any]]:
+        """Retrieve available tools from the least busy session."""
+        return await self._run("list_tools")
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any]) -> Any:
+        """Call a tool on the least busy session."""
+        self.stats["calls"] += 1
+        return await self._run("call_tool", tool_name, arguments)
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert MCP content objects into plain JSON-compatible data."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    return value
+
+
+class ToolResultCache:
+    """Byte-bounded LRU cache of tool results with an optional on-disk store.
+
+    Only tools matching an ``allow`` pattern (all tools when ``allow`` is not
+    given) and no ``deny`` pattern are cached. Patterns use shell-style
+    wildcards, e.g. ``search_*``.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        directory: Path = None,
+        allow: list[str] = None,
+        deny: list[str] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory else None
+        self.allow = allow
+        self.deny = deny or []
+        self.stats: dict[str, dict[str, int]] = {}
+        self._entries: OrderedDict[str, tuple[Any, int]] = OrderedDict()
+        self._size = 0
+
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: dict[str, Any]) -> str:
+        """Build a cache key from the tool name and canonicalized arguments."""
+        canonical = json.dumps(
+            {"tool": tool_name, "arguments": arguments or {}},
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        """Check a tool name against the allow and deny lists."""
+        if any(fnmatch.fnmatchcase(tool_name, pattern) for pattern in self.deny):
+            return False
+        if self.allow is None:
+            return True
+        return any(fnmatch.fnmatchcase(tool_name, pattern) for pattern in self.allow)
+
+    def record(self, tool_name: str, hit: bool) -> None:
+        """Count a cache hit or miss for a tool."""
+        counters = self.stats.setdefault(tool_name, {"hits": 0, "misses": 0})
+        counters["hits" if hit else "misses"] += 1
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Look up a result in memory, then on disk."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return True, self._entries[key][0]
+
+        if self.directory:
+            path = self.directory / f"{key}.json"
+            try:
+                encoded = path.read_bytes()
+            except FileNotFoundError:
+                return False, None
+            value = json.loads(encoded)
+            self._remember(key, value, len(encoded))
+            return True, value
+
+        return False, None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a JSON-compatible result in memory and, if configured, on disk."""
+        encoded = json.dumps(value).encode()
+        self._remember(key, value, len(encoded))
+
+        if self.directory:
+            write_atomic(self.directory / f"{key}.json", encoded)
+
+    def _remember(self, key: str, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._size -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self._size += size
+        while self._size > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+
+
+class CachedMCPConnection:
+    """MCP connection wrapper that memoizes results of idempotent tool calls.
+
+    Identical calls that are already in flight share one request to the server.
+    Failed calls, including ToolError results, are never cached.
+    """
+
+    def __init__(self, connection: MCPConnection, cache: ToolResultCache):
+        self.connection = connection
+        self.cache = cache
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+    async def __aenter__(self):
+        await self.connection.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return await self.connection.__aexit__(exc_type, exc_val, exc_tb)
+
+    async def list_tools(self) -> list[dict[str, Any]]:
+        """Retrieve available tools from the wrapped connection."""
+        return await self.connection.list_tools()
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any]) -> Any:
+        """Call a tool, serving repeated calls from the cache."""
+        if not self.cache.is_cacheable(tool_name):
+            return await self.connection.call_tool(tool_name, arguments)
+
+        key = self.cache.make_key(tool_name, arguments)
+        found, value = self.cache.get(key)
+        if not found and key in self._in_flight:
+            found, value = True, await asyncio.shield(self._in_flight[key])
+        self.cache.record(tool_name, hit=found)
+        if found:
+            return value
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            value = await self.connection.call_tool(tool_name, arguments)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+        self.cache.put(key, value)
+        future.set_result(value)
+        return value
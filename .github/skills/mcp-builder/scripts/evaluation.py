@@ -1,22 +1,43 @@
 """MCP Server Evaluation Harness
 
 This script evaluates MCP servers by running test questions against them using Claude.
+
+The ``anthropic`` and ``mcp`` packages are imported only when a client or
+connection is built, and startup overlaps building the model client with
+starting the MCP server.
 """
 
 import argparse
 import asyncio
+import concurrent.futures
+import contextlib
+import functools
 import json
+import multiprocessing
+import os
 import re
+import signal
 import sys
+import tempfile
 import time
 import traceback
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, Iterator
+
+from batching import BatchRequestError, BatchingClient, LocalBatchBackend, MessageBatchesBackend
+from cassettes import Cassette, CassetteClient, CassetteConnection, ToolCallError, request_key
+from clients import call_client
+from connections import CachedMCPConnection, MCPConnectionPool, ToolError, ToolResultCache, create_connection, to_jsonable
+from metrics import MetricsCollector
+from ratelimit import AdaptiveConcurrency, RateLimiter
+from storage import write_atomic
+from trials import TRIALS_TEMPLATE, TrialPolicy, run_trials
 
-from anthropic import Anthropic
+if TYPE_CHECKING:
+    from anthropic import Anthropic, AsyncAnthropic
 
-from connections import create_connection
+PROCESS_START = time.perf_counter()
 
 EVALUATION_PROMPT = """You are an AI assistant with access to tools.
 
@@ -52,28 +73,117 @@ Response Requirements:
 - For names or text, provide the exact text requested
 - Your response should go last"""
 
+BATCH_CONCURRENCY = 1000
+
+# Bytes of the evaluation file fed to the XML parser at a time.
+PARSE_CHUNK_SIZE = 64 * 1024
+
+
+class EvaluationFileError(ValueError):
+    """Raised when an evaluation file is not well-formed XML."""
+
+
+def iter_evaluation_file(file_path: Path) -> Iterator[dict[str, Any]]:
+    """Incrementally parse an XML evaluation file, yielding QA pairs lazily.
+
+    The file is fed to the parser in fixed-size chunks and each ``qa_pair``
+    element is removed from the tree once it has been read, so memory stays
+    flat for very large files, minified or not. Pairs without a question or
+    answer are reported by number and skipped. Malformed XML raises
+    EvaluationFileError with the line and column of the error.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    open_elements = []
+    pair_index = 0
+
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(PARSE_CHUNK_SIZE), b""):
+            try:
+                parser.feed(chunk)
+                events = list(parser.read_events())
+            except ET.ParseError as e:
+                raise EvaluationFileError(str(e)) from None
+
+            for event, elem in events:
+                if event == "start":
+                    open_elements.append(elem)
+                    continue
+
+                open_elements.pop()
+                if elem.tag != "qa_pair":
+                    continue
+
+                pair_index += 1
+                question_elem = elem.find("question")
+                answer_elem = elem.find("answer")
+                if question_elem is None or answer_elem is None:
+                    missing = "question" if question_elem is None else "answer"
+                    print(f"Warning: Skipping qa_pair #{pair_index} in {file_path}: missing <{missing}>")
+                else:
+                    yield {
+                        "question": (question_elem.text or "").strip(),
+                        "answer": (answer_elem.text or "").strip(),
+                    }
+
+                elem.clear()
+                if open_elements:
+                    open_elements[-1].remove(elem)
+
+        try:
+            parser.close()
+        except ET.ParseError as e:
+            raise EvaluationFileError(str(e)) from None
+
 
 def parse_evaluation_file(file_path: Path) -> list[dict[str, Any]]:
     """Parse XML evaluation file with qa_pair elements."""
-    try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        evaluations = []
+    return list(iter_evaluation_file(file_path))
 
-        for qa_pair in root.findall(".//qa_pair"):
-            question_elem = qa_pair.find("question")
-            answer_elem = qa_pair.find("answer")
 
-            if question_elem is not None and answer_elem is not None:
-                evaluations.append({
-                    "question": (question_elem.text or "").strip(),
-                    "answer": (answer_elem.text or "").strip(),
-                })
+def create_async_client(max_connections: int = 100, keepalive_expiry: float = 30.0) -> "AsyncAnthropic":
+    """Create an async Anthropic client whose HTTP connection pool is shared by all tasks.
 
-        return evaluations
-    except Exception as e:
-        print(f"Error parsing evaluation file {file_path}: {e}")
-        return []
+    Idle connections are kept alive for ``keepalive_expiry`` seconds so that
+    concurrent tasks reuse them instead of paying for new TLS handshakes.
+    """
+    import httpx
+    from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    return AsyncAnthropic(http_client=DefaultAsyncHttpxClient(limits=limits))
+
+
+def is_model_request_error(error: BaseException) -> bool:
+    """Whether ``error`` is a model request that failed for good, rather than a bug or a replay miss."""
+    anthropic = sys.modules.get("anthropic")
+    return isinstance(error, BatchRequestError) or (anthropic is not None and isinstance(error, anthropic.APIError))
+
+
+async def create_message(
+    client: "Anthropic | AsyncAnthropic | CassetteClient | BatchingClient",
+    rate_limiter: RateLimiter | None = None,
+    **kwargs: Any,
+) -> Any:
+    """Call messages.create, awaiting async clients and offloading sync ones to a thread.
+
+    With a ``rate_limiter`` the call waits for the RPM/TPM budgets and is
+    retried with backoff on throttling and transient errors.
+    """
+    async def send() -> Any:
+        return await call_client(client, client.messages.create, **kwargs)
+
+    if rate_limiter is None:
+        return await send()
+    return await rate_limiter.call(send, estimated_tokens=estimate_request_tokens(kwargs))
+
+
+def estimate_request_tokens(kwargs: dict[str, Any]) -> int:
+    """Roughly estimate a request's input tokens at four bytes per token."""
+    return len(json.dumps(to_jsonable(kwargs), default=str)) // 4
 
 
 def extract_xml_content(text: str, tag: str) -> str | None:
@@ -83,93 +193,240 @@ def extract_xml_content(text: str, tag: str) -> str | None:
     return matches[-1].strip() if matches else None
 
 
+async def execute_tool_use(connection: Any, tool_use: Any) -> tuple[dict[str, Any], float]:
+    """Execute one tool_use block and build its tool_result entry."""
+    tool_start_ts = time.perf_counter()
+    try:
+        tool_result = await connection.call_tool(tool_use.name, tool_use.input)
+        tool_response = json.dumps(tool_result) if isinstance(tool_result, (dict, list)) else str(tool_result)
+        is_error = False
+    except ToolError as e:
+        tool_response = str(e)
+        is_error = True
+    except Exception as e:
+        tool_response = f"Error executing tool {tool_use.name}: {str(e)}\n"
+        tool_response += e.formatted_traceback if isinstance(e, ToolCallError) else traceback.format_exc()
+        is_error = True
+    tool_duration = time.perf_counter() - tool_start_ts
+
+    block = {
+        "type": "tool_result",
+        "tool_use_id": tool_use.id,
+        "content": tool_response,
+    }
+    if is_error:
+        block["is_error"] = True
+    return block, tool_duration
+
+
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+
+
+def apply_prompt_caching(tools: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Mark the system prompt and tool definitions as a cacheable prompt prefix.
+
+    The cache breakpoint on the last tool covers every tool definition, and the
+    one on the system prompt extends the cached prefix through the system text.
+    """
+    system = [{"type": "text", "text": EVALUATION_PROMPT, "cache_control": {"type": "ephemeral"}}]
+    cached_tools = [dict(tool) for tool in tools]
+    if cached_tools:
+        cached_tools[-1]["cache_control"] = {"type": "ephemeral"}
+    return system, cached_tools
+
+
+def task_tokens(loop_metrics: dict[str, Any]) -> int:
+    """Total input and output tokens a task has used so far."""
+    return sum(loop_metrics[field] for field in USAGE_FIELDS)
+
+
+def record_turn(loop_metrics: dict[str, Any], response: Any, model_latency: float) -> None:
+    """Add a model turn's latency and token usage to the loop metrics."""
+    usage = getattr(response, "usage", None)
+    turn_usage = {field: getattr(usage, field, None) or 0 for field in USAGE_FIELDS}
+    for field in USAGE_FIELDS:
+        loop_metrics[field] += turn_usage[field]
+
+    loop_metrics["turns"].append({
+        "model_latency": model_latency,
+        "tool_latency": 0.0,
+        "input_tokens": turn_usage["input_tokens"]
+        + turn_usage["cache_read_input_tokens"]
+        + turn_usage["cache_creation_input_tokens"],
+        "output_tokens": turn_usage["output_tokens"],
+    })
+
+
+def compact_tool_results(
+    messages: list[dict[str, Any]],
+    threshold: int,
+    keep_recent: int,
+    compacted_ids: set[str],
+) -> int:
+    """Truncate large tool results outside the most recent tool turns.
+
+    Results that would still be shorter after compaction keep their first
+    ``threshold`` bytes followed by a marker. Returns the number of bytes
+    removed.
+    """
+    tool_turns = [message for message in messages if message["role"] == "user" and isinstance(message["content"], list)]
+    older_turns = tool_turns[:-keep_recent] if keep_recent > 0 else tool_turns
+    bytes_saved = 0
+
+    for message in older_turns:
+        for block in message["content"]:
+            if block["type"] != "tool_result" or block["tool_use_id"] in compacted_ids:
+                continue
+            encoded = block["content"].encode()
+            marker = f"\n... [compacted: {len(encoded) - threshold} bytes of older tool output omitted]"
+            if len(encoded) <= threshold + len(marker):
+                continue
+            block["content"] = encoded[:threshold].decode(errors="ignore") + marker
+            compacted_ids.add(block["tool_use_id"])
+            bytes_saved += len(encoded) - len(block["content"].encode())
+
+    return bytes_saved
+
+
 async def agent_loop(
-    client: Anthropic,
+    client: "Anthropic | AsyncAnthropic",
     model: str,
     question: str,
     tools: list[dict[str, Any]],
     connection: Any,
-) -> tuple[str, dict[str, Any]]:
-    """Run the agent loop with MCP tools."""
+    prompt_caching: bool = False,
+    max_turns: int | None = None,
+    max_task_tokens: int | None = None,
+    compact_threshold: int | None = None,
+    compact_keep_recent: int = 1,
+    rate_limiter: RateLimiter | None = None,
+) -> tuple[str, dict[str, Any], dict[str, Any]]:
+    """Run the agent loop with MCP tools.
+
+    Every tool_use block of a turn is executed concurrently and all results
+    are returned to the model in a single user message. With
+    ``prompt_caching`` the system prompt and tool definitions are sent as a
+    cacheable prefix.
+
+    The loop stops after ``max_turns`` model turns or once the task has used
+    ``max_task_tokens`` input plus output tokens. With ``compact_threshold``,
+    tool results older than the last ``compact_keep_recent`` tool turns are
+    truncated to that many bytes before each model call. Model requests go
+    through ``rate_limiter`` when one is given. A model request that fails
+    for good stops the loop with stop_reason "model_error" and the error in
+    the loop metrics.
+    """
     messages = [{"role": "user", "content": question}]
-
-    response = await asyncio.to_thread(
-        client.messages.create,
-        model=model,
-        max_tokens=4096,
-        system=EVALUATION_PROMPT,
-        messages=messages,
-        tools=tools,
-    )
-
-    messages.append({"role": "assistant", "content": response.content})
+    system = EVALUATION_PROMPT
+    if prompt_caching:
+        system, tools = apply_prompt_caching(tools)
 
     tool_metrics = {}
+    loop_metrics = {"tool_turns": 0, "tool_wall_time": 0.0, "tool_serial_time": 0.0, "turns": []}
+    loop_metrics.update(dict.fromkeys(USAGE_FIELDS, 0))
+    loop_metrics.update({"stop_reason": None, "error": None, "compacted_bytes": 0})
+    compacted_ids = set()
 
-    while response.stop_reason == "tool_use":
-        tool_use = next(block for block in response.content if block.type == "tool_use")
-        tool_name = tool_use.name
-        tool_input = tool_use.input
-
-        tool_start_ts = time.time()
+    async def next_response() -> Any:
+        model_start_ts = time.perf_counter()
         try:
-            tool_result = await connection.call_tool(tool_name, tool_input)
-            tool_response = json.dumps(tool_result) if isinstance(tool_result, (dict, list)) else str(tool_result)
+            response = await create_message(
+                client,
+                rate_limiter,
+                model=model,
+                max_tokens=4096,
+                system=system,
+                messages=messages,
+                tools=tools,
+            )
         except Exception as e:
-            tool_response = f"Error executing tool {tool_name}: {str(e)}\n"
-            tool_response += traceback.format_exc()
-        tool_duration = time.time() - tool_start_ts
-
-        if tool_name not in tool_metrics:
-            tool_metrics[tool_name] = {"count": 0, "durations": []}
-        tool_metrics[tool_name]["count"] += 1
-        tool_metrics[tool_name]["durations"].append(tool_duration)
+            if not is_model_request_error(e):
+                raise
+            loop_metrics["stop_reason"] = "model_error"
+            loop_metrics["error"] = f"{type(e).__name__}: {e}"
+            return None
+        messages.append({"role": "assistant", "content": response.content})
+        record_turn(loop_metrics, response, time.perf_counter() - model_start_ts)
+        return response
+
+    response = await next_response()
+    while response is not None and response.stop_reason == "tool_use":
+        tool_uses = [block for block in response.content if block.type == "tool_use"]
+        if not tool_uses:
+            break
+        if max_turns is not None and len(loop_metrics["turns"]) >= max_turns:
+            loop_metrics["stop_reason"] = "max_turns"
+            break
+        if max_task_tokens is not None and task_tokens(loop_metrics) >= max_task_tokens:
+            loop_metrics["stop_reason"] = "token_budget"
+            break
+
+        fanout_start_ts = time.perf_counter()
+        outcomes = await asyncio.gather(*(execute_tool_use(connection, tool_use) for tool_use in tool_uses))
+        fanout_duration = time.perf_counter() - fanout_start_ts
+
+        for tool_use, (_, tool_duration) in zip(tool_uses, outcomes):
+            if tool_use.name not in tool_metrics:
+                tool_metrics[tool_use.name] = {"count": 0, "durations": []}
+            tool_metrics[tool_use.name]["count"] += 1
+            tool_metrics[tool_use.name]["durations"].append(tool_duration)
+
+        loop_metrics["tool_turns"] += 1
+        loop_metrics["tool_wall_time"] += fanout_duration
+        loop_metrics["tool_serial_time"] += sum(tool_duration for _, tool_duration in outcomes)
+        loop_metrics["turns"][-1]["tool_latency"] = fanout_duration
 
         messages.append({
             "role": "user",
-            "content": [{
-                "type": "tool_result",
-                "tool_use_id": tool_use.id,
-                "content": tool_response,
-            }]
+            "content": [tool_result for tool_result, _ in outcomes],
         })
+        if compact_threshold is not None:
+            loop_metrics["compacted_bytes"] += compact_tool_results(
+                messages, compact_threshold, compact_keep_recent, compacted_ids
+            )
 
-        response = await asyncio.to_thread(
-            client.messages.create,
-            model=model,
-            max_tokens=4096,
-            system=EVALUATION_PROMPT,
-            messages=messages,
-            tools=tools,
-        )
-        messages.append({"role": "assistant", "content": response.content})
+        response = await next_response()
 
     response_text = next(
-        (block.text for block in response.content if hasattr(block, "text")),
+        (block.text for block in (response.content if response is not None else []) if hasattr(block, "text")),
         None,
     )
-    return response_text, tool_metrics
+    return response_text, tool_metrics, loop_metrics
 
 
 async def evaluate_single_task(
-    client: Anthropic,
+    client: "Anthropic | AsyncAnthropic",
     model: str,
     qa_pair: dict[str, Any],
     tools: list[dict[str, Any]],
     connection: Any,
     task_index: int,
+    log: Callable[[str], None] = print,
+    prompt_caching: bool = False,
+    **loop_options: Any,
 ) -> dict[str, Any]:
-    """Evaluate a single QA pair with the given tools."""
-    start_time = time.time()
+    """Evaluate a single QA pair with the given tools.
 
-    print(f"Task {task_index + 1}: Running task with question: {qa_pair['question']}")
-    response, tool_metrics = await agent_loop(client, model, qa_pair["question"], tools, connection)
+    ``loop_options`` (turn and token limits, compaction) are passed to
+    ``agent_loop``.
+    """
+    start_time = time.perf_counter()
+
+    log(f"Task {task_index + 1}: Running task with question: {qa_pair['question']}")
+    response, tool_metrics, loop_metrics = await agent_loop(
+        client, model, qa_pair["question"], tools, connection, prompt_caching=prompt_caching, **loop_options
+    )
+    if loop_metrics["error"]:
+        log(f"Task {task_index + 1}: Model request failed ({loop_metrics['error']})")
+    elif loop_metrics["stop_reason"]:
+        log(f"Task {task_index + 1}: Stopped early ({loop_metrics['stop_reason']})")
+    response = response or ""
 
     response_value = extract_xml_content(response, "response")
     summary = extract_xml_content(response, "summary")
     feedback = extract_xml_content(response, "feedback")
 
-    duration_seconds = time.time() - start_time
+    duration_seconds = time.perf_counter() - start_time
 
     return {
         "question": qa_pair["question"],
@@ -179,6 +436,14 @@ async def evaluate_single_task(
         "total_duration": duration_seconds,
         "tool_calls": tool_metrics,
         "num_tool_calls": sum(len(metrics["durations"]) for metrics in tool_metrics.values()),
+        "tool_wall_time": loop_metrics["tool_wall_time"],
+        "tool_time_saved": max(0.0, loop_metrics["tool_serial_time"] - loop_metrics["tool_wall_time"]),
+        "usage": {field: loop_metrics[field] for field in USAGE_FIELDS},
+        "turns": loop_metrics["turns"],
+        "turns_used": len(loop_metrics["turns"]),
+        "stop_reason": loop_metrics["stop_reason"],
+        "error": loop_metrics["error"],
+        "compacted_bytes": loop_metrics["compacted_bytes"],
         "summary": summary,
         "feedback": feedback,
     }
@@ -193,6 +458,32 @@ REPORT_HEADER = """
 - **Average Task Duration**: {average_duration_s:.2f}s
 - **Average Tool Calls per Task**: {average_tool_calls:.2f}
 - **Total Tool Calls**: {total_tool_calls}
+- **Tool Time Saved by Parallel Calls**: {tool_time_saved:.2f}s
+- **Input Tokens**: {input_tokens} uncached, {cache_read_input_tokens} cache read, {cache_creation_input_tokens} cache write
+- **Output Tokens**: {output_tokens}
+- **Turns Used**: {total_turns} ({stopped_early} tasks stopped early by a turn or token limit or a failed model request)
+- **Tool Output Compacted**: {compacted_bytes} bytes
+
+---
+"""
+
+TOOL_CACHE_TEMPLATE = """
+## Tool Result Cache
+
+| Tool | Hits | Misses | Hit Rate |
+|------|------|--------|----------|
+{rows}
+
+---
+"""
+
+RATE_LIMIT_TEMPLATE = """
+## Rate Limiting
+
+- **Model Requests**: {requests} ({retries} retries, {throttled} throttled, {failures} failed)
+- **Time Waiting for RPM/TPM Budget**: {budget_wait:.2f}s
+- **Time in Retry Backoff**: {backoff_wait:.2f}s
+- **Adaptive Concurrency Limit**: {concurrency_limit}
 
 ---
 """
@@ -203,9 +494,12 @@ TASK_TEMPLATE = """
 **Question**: {question}
 **Ground Truth Answer**: `{expected_answer}`
 **Actual Answer**: `{actual_answer}`
-**Correct**: {correct_indicator}
+**Correct**: {correct_indicator}{trials_note}
 **Duration**: {total_duration:.2f}s
 **Tool Calls**: {tool_calls}
+**Tool Time**: {tool_wall_time:.2f}s wall ({tool_time_saved:.2f}s saved by parallel calls)
+**Tokens**: {input_tokens} in ({cache_read_input_tokens} cache read, {cache_creation_input_tokens} cache write), {output_tokens} out
+**Turns**: {turns_used}{stop_note} ({compacted_bytes} bytes of tool output compacted)
 
 **Summary**
 {summary}
@@ -217,57 +511,432 @@ TASK_TEMPLATE = """
 """
 
 
+def format_trials_note(result: dict[str, Any]) -> str:
+    """Describe a task's repeated trials next to its verdict, if it had any."""
+    if "trials" not in result:
+        return ""
+    trials_run = len(result["trials"])
+    passes = sum(trial["score"] for trial in result["trials"])
+    skipped = result["trials_budget"] - trials_run
+    return (
+        f" ({passes}/{trials_run} trials passed, {result['pass_rate']:.0%}; "
+        f"{result['confidence']:.0%} CI {result['ci_low']:.0%}-{result['ci_high']:.0%}"
+        + (f"; stopped early, {skipped} trials skipped" if skipped else "")
+        + ("" if result["decided"] is not None else "; undecided")
+        + ")"
+    )
+
+
+def format_stop_note(result: dict[str, Any]) -> str:
+    """Describe why a task stopped early, if it did."""
+    if not result["stop_reason"]:
+        return ""
+    error = result.get("error")
+    return f", stopped by {result['stop_reason']}" + (f" ({error})" if error else "")
+
+
+def format_task_section(task_index: int, result: dict[str, Any]) -> str:
+    """Render one task result with TASK_TEMPLATE."""
+    return TASK_TEMPLATE.format(
+        task_num=task_index + 1,
+        question=result["question"],
+        expected_answer=result["expected"],
+        actual_answer=result["actual"] or "N/A",
+        correct_indicator="✅" if result["score"] else "❌",
+        trials_note=format_trials_note(result),
+        total_duration=result["total_duration"],
+        tool_calls=json.dumps(result["tool_calls"], indent=2),
+        tool_wall_time=result["tool_wall_time"],
+        tool_time_saved=result["tool_time_saved"],
+        **result["usage"],
+        turns_used=result["turns_used"],
+        stop_note=format_stop_note(result),
+        compacted_bytes=result["compacted_bytes"],
+        summary=result["summary"] or "N/A",
+        feedback=result["feedback"] or "N/A",
+    )
+
+
+class ReportTotals:
+    """Running aggregates for the report summary, updated as each task finishes."""
+
+    def __init__(self):
+        self.total = 0
+        self.correct = 0
+        self.total_duration = 0.0
+        self.total_tool_calls = 0
+        self.tool_time_saved = 0.0
+        self.usage = dict.fromkeys(USAGE_FIELDS, 0)
+        self.total_turns = 0
+        self.stopped_early = 0
+        self.compacted_bytes = 0
+        self.trials = {
+            "trials_run": 0, "trials_budget": 0, "pass_rate_sum": 0.0,
+            "decided_pass": 0, "decided_fail": 0, "undecided": 0, "confidence": 0.0,
+        }
+
+    def add(self, result: dict[str, Any]) -> None:
+        """Fold one task result into the aggregates."""
+        self.total += 1
+        self.correct += result["score"]
+        self.total_duration += result["total_duration"]
+        self.total_tool_calls += result["num_tool_calls"]
+        self.tool_time_saved += result["tool_time_saved"]
+        for field in USAGE_FIELDS:
+            self.usage[field] += result["usage"][field]
+        self.total_turns += result["turns_used"]
+        self.stopped_early += bool(result["stop_reason"])
+        self.compacted_bytes += result["compacted_bytes"]
+        if "trials" in result:
+            self.trials["trials_run"] += len(result["trials"])
+            self.trials["trials_budget"] += result["trials_budget"]
+            self.trials["pass_rate_sum"] += result["pass_rate"]
+            self.trials["confidence"] = result["confidence"]
+            verdict = {True: "decided_pass", False: "decided_fail", None: "undecided"}[result["decided"]]
+            self.trials[verdict] += 1
+
+    def format_header(self) -> str:
+        """Render REPORT_HEADER from the aggregates."""
+        return REPORT_HEADER.format(
+            correct=self.correct,
+            total=self.total,
+            accuracy=(self.correct / self.total) * 100 if self.total else 0,
+            average_duration_s=self.total_duration / self.total if self.total else 0,
+            average_tool_calls=self.total_tool_calls / self.total if self.total else 0,
+            total_tool_calls=self.total_tool_calls,
+            tool_time_saved=self.tool_time_saved,
+            **self.usage,
+            total_turns=self.total_turns,
+            stopped_early=self.stopped_early,
+            compacted_bytes=self.compacted_bytes,
+        )
+
+    def format_trials(self) -> str:
+        """Render TRIALS_TEMPLATE, or nothing when tasks ran a single trial."""
+        trials = self.trials
+        if not trials["trials_run"]:
+            return ""
+        questions = trials["decided_pass"] + trials["decided_fail"] + trials["undecided"]
+        return TRIALS_TEMPLATE.format(
+            trials_run=trials["trials_run"],
+            trials_budget=trials["trials_budget"],
+            trials_skipped=trials["trials_budget"] - trials["trials_run"],
+            mean_pass_rate=trials["pass_rate_sum"] / questions * 100,
+            decided_pass=trials["decided_pass"],
+            decided_fail=trials["decided_fail"],
+            undecided=trials["undecided"],
+            confidence=trials["confidence"],
+        )
+
+
+class ResultSink:
+    """Append each finished task to a JSONL file and, optionally, a live Markdown report.
+
+    Records are flushed as soon as they are written, so a crashed run keeps
+    every task that finished before the crash.
+    """
+
+    def __init__(self, jsonl_path: Path, markdown_path: Path | None = None):
+        self.jsonl_path = jsonl_path
+        self.markdown_path = markdown_path
+        self._jsonl = open(jsonl_path, "w", encoding="utf-8")
+        self._markdown = open(markdown_path, "w", encoding="utf-8") if markdown_path else None
+        if self._markdown:
+            self._markdown.write("# Evaluation Report (live)\n")
+            self._markdown.flush()
+
+    def write(self, task_index: int, result: dict[str, Any]) -> None:
+        """Append one finished task."""
+        self._jsonl.write(json.dumps({"task_index": task_index, **result}) + "\n")
+        self._jsonl.flush()
+        if self._markdown:
+            self._markdown.write(format_task_section(task_index, result))
+            self._markdown.flush()
+
+    def read_results(self) -> list[tuple[int, dict[str, Any]]]:
+        """Read back the written records in task order."""
+        with open(self.jsonl_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        return sorted(((record.pop("task_index"), record) for record in records), key=lambda item: item[0])
+
+    def close(self, summary: str | None = None) -> None:
+        """Close the sink, appending the final summary to the live Markdown report."""
+        self._jsonl.close()
+        if self._markdown:
+            if summary:
+                self._markdown.write(summary)
+            self._markdown.close()
+
+
+class CheckpointStore:
+    """Content-addressed store of finished task results for resumable runs.
+
+    A task's fingerprint covers its question and expected answer, the model,
+    the evaluation prompt, the tool schemas returned by ``list_tools`` and the
+    options passed to ``bind``, so any change to these makes the stored result
+    stale.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._context_key = None
+
+    def bind(self, model: str, tools: list[dict[str, Any]], options: dict[str, Any] | None = None) -> None:
+        """Fix the run-wide parts of the fingerprint.
+
+        ``options`` that change what a result means (such as turn limits,
+        compaction or the trial policy) are included too.
+        """
+        context = {"model": model, "prompt": EVALUATION_PROMPT, "tools": tools}
+        if options:
+            context["options"] = options
+        self._context_key = request_key(context)
+
+    def fingerprint(self, qa_pair: dict[str, Any]) -> str:
+        """Fingerprint a task within the bound run context."""
+        return request_key({
+            "context": self._context_key,
+            "question": qa_pair["question"],
+            "answer": qa_pair["answer"],
+        })
+
+    def load(self, fingerprint: str) -> dict[str, Any] | None:
+        """Return the stored result for a fingerprint, if any."""
+        try:
+            return json.loads((self.directory / f"{fingerprint}.json").read_text())
+        except FileNotFoundError:
+            return None
+
+    def save(self, fingerprint: str, result: dict[str, Any]) -> None:
+        """Store a finished task result."""
+        write_atomic(self.directory / f"{fingerprint}.json", json.dumps(result).encode())
+
+
+async def schedule_tasks(
+    qa_pairs: Iterable[dict[str, Any]],
+    run_task: Callable[[int, dict[str, Any], float], Awaitable[dict[str, Any]]],
+    concurrency: int = 1,
+    shard: tuple[int, int] | None = None,
+) -> list[dict[str, Any]]:
+    """Run tasks with at most ``concurrency`` in flight, returning results in input order.
+
+    QA pairs are pulled from ``qa_pairs`` only when a slot is free, so lazy
+    iterables are consumed at the pace of the scheduler. ``run_task`` receives
+    the time each task spent queued: since the scheduler started for a list of
+    pairs, and since its pair was read for a lazy iterable. With ``shard=(index, count)``
+    only every ``count``-th QA pair starting at ``index`` is run, keeping its
+    original task index. The first task to raise stops the run: no further
+    tasks are started, the ones in flight are cancelled and its exception is
+    re-raised.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    start_ts = time.perf_counter()
+    preloaded = isinstance(qa_pairs, (list, tuple))
+    failed = asyncio.Event()
+    tasks = []
+
+    def on_done(task: asyncio.Task) -> None:
+        semaphore.release()
+        if not task.cancelled() and task.exception() is not None:
+            failed.set()
+
+    try:
+        for i, qa_pair in enumerate(qa_pairs):
+            if shard and i % shard[1] != shard[0]:
+                continue
+            enqueued_ts = start_ts if preloaded else time.perf_counter()
+            await semaphore.acquire()
+            if failed.is_set():
+                break
+            task = asyncio.create_task(run_task(i, qa_pair, time.perf_counter() - enqueued_ts))
+            task.add_done_callback(on_done)
+            tasks.append(task)
+        # gather raises as soon as one task fails, without waiting for the rest
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def format_tool_cache_stats(stats: dict[str, dict[str, int]]) -> str:
+    """Render per-tool cache hit/miss counters as a report section."""
+    rows = []
+    for tool_name, counters in sorted(stats.items()):
+        lookups = counters["hits"] + counters["misses"]
+        hit_rate = counters["hits"] / lookups * 100 if lookups else 0
+        rows.append(f"| {tool_name} | {counters['hits']} | {counters['misses']} | {hit_rate:.1f}% |")
+    return TOOL_CACHE_TEMPLATE.format(rows="\n".join(rows) or "| (no cacheable calls) | 0 | 0 | 0.0% |")
+
+
+def rate_limit_summary(rate_limiter: RateLimiter) -> dict[str, Any]:
+    """Collect rate limiter counters and the adaptive concurrency state."""
+    concurrency = rate_limiter.concurrency
+    return {
+        **rate_limiter.stats,
+        "concurrency_limit": (
+            f"{int(concurrency.limit)} at end (lowest {int(concurrency.lowest)}, ceiling {concurrency.maximum})"
+            if concurrency else "not adaptive"
+        ),
+    }
+
+
+def format_rate_limit_stats(summary: dict[str, Any]) -> str:
+    """Render rate limiter counters as a report section."""
+    return RATE_LIMIT_TEMPLATE.format(**summary)
+
+
+async def timed(timings: dict[str, float], step: str, awaitable: Awaitable[Any]) -> Any:
+    """Await ``awaitable``, recording its duration under ``step``."""
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[step] = time.perf_counter() - started
+
+
+def format_startup_timings(timings: dict[str, float]) -> str:
+    """Render startup step durations and the time until tasks can start."""
+    steps = ", ".join(f"{step} {duration:.2f}s" for step, duration in timings.items())
+    return f"⏱️  Startup: {steps}; ready {time.perf_counter() - PROCESS_START:.2f}s after launch"
+
+
+def format_summary(
+    totals: ReportTotals,
+    metrics: MetricsCollector,
+    tool_cache_stats: dict[str, dict[str, int]] | None = None,
+    rate_limit_stats: dict[str, Any] | None = None,
+) -> str:
+    """Render every report section that precedes the per-task sections."""
+    report = totals.format_header()
+    report += totals.format_trials()
+    report += metrics.format_markdown()
+    if tool_cache_stats is not None:
+        report += format_tool_cache_stats(tool_cache_stats)
+    if rate_limit_stats is not None:
+        report += format_rate_limit_stats(rate_limit_stats)
+    return report
+
+
 async def run_evaluation(
     eval_path: Path,
     connection: Any,
     model: str = "claude-3-7-sonnet-20250219",
+    concurrency: int = 1,
+    client: "Anthropic | AsyncAnthropic | None" = None,
+    prompt_caching: bool = False,
+    stream: bool = False,
+    sink: ResultSink | None = None,
+    checkpoints: CheckpointStore | None = None,
+    metrics: MetricsCollector | None = None,
+    loop_options: dict[str, Any] | None = None,
+    shard: tuple[int, int] | None = None,
+    startup_timings: dict[str, float] | None = None,
+    trial_policy: TrialPolicy | None = None,
+    qa_pairs: list[dict[str, Any]] | None = None,
 ) -> str:
-    """Run evaluation with MCP server tools."""
+    """Run evaluation with MCP server tools, or on ``qa_pairs`` already parsed from ``eval_path``."""
     print("🚀 Starting Evaluation")
 
-    client = Anthropic()
-
-    tools = await connection.list_tools()
+    if client is None:
+        from anthropic import Anthropic
+
+        client = Anthropic()
+
+    startup_timings = dict(startup_timings or {})
+    if stream or qa_pairs is not None:
+        tools = await timed(startup_timings, "list_tools", connection.list_tools())
+        if stream:
+            qa_pairs = iter_evaluation_file(eval_path)
+    else:
+        # Fetch the tool list while the evaluation file is parsed
+        tools, qa_pairs = await asyncio.gather(
+            timed(startup_timings, "list_tools", connection.list_tools()),
+            timed(startup_timings, "eval file", asyncio.to_thread(parse_evaluation_file, eval_path)),
+        )
     print(f"📋 Loaded {len(tools)} tools from MCP server")
 
-    qa_pairs = parse_evaluation_file(eval_path)
-    print(f"📋 Loaded {len(qa_pairs)} evaluation tasks")
-
-    results = []
-    for i, qa_pair in enumerate(qa_pairs):
-        print(f"Processing task {i + 1}/{len(qa_pairs)}")
-        result = await evaluate_single_task(client, model, qa_pair, tools, connection, i)
-        results.append(result)
-
-    correct = sum(r["score"] for r in results)
-    accuracy = (correct / len(results)) * 100 if results else 0
-    average_duration_s = sum(r["total_duration"] for r in results) / len(results) if results else 0
-    average_tool_calls = sum(r["num_tool_calls"] for r in results) / len(results) if results else 0
-    total_tool_calls = sum(r["num_tool_calls"] for r in results)
-
-    report = REPORT_HEADER.format(
-        correct=correct,
-        total=len(results),
-        accuracy=accuracy,
-        average_duration_s=average_duration_s,
-        average_tool_calls=average_tool_calls,
-        total_tool_calls=total_tool_calls,
+    if stream:
+        total = "?"
+        print("📋 Streaming evaluation tasks")
+    else:
+        total = len(qa_pairs)
+        print(f"📋 Loaded {total} evaluation tasks")
+    if shard:
+        print(f"📋 Running shard {shard[0] + 1}/{shard[1]}")
+    print(format_startup_timings(startup_timings))
+
+    totals = ReportTotals()
+    if metrics is None:
+        metrics = MetricsCollector()
+
+    if checkpoints:
+        # The rate limiter only changes how fast results arrive, not what they are
+        options = {
+            key: value for key, value in (loop_options or {}).items() if key != "rate_limiter" and value is not None
+        }
+        if trial_policy:
+            options["trial_policy"] = vars(trial_policy)
+        checkpoints.bind(model, tools, options=options)
+
+    async def run_task(i: int, qa_pair: dict[str, Any], queue_wait: float) -> dict[str, Any] | None:
+        # Concurrent tasks print their output as one block when they finish, so it never interleaves
+        output = []
+        log = print if concurrency <= 1 else output.append
+        log(f"Processing task {i + 1}/{total}")
+
+        try:
+            fingerprint = checkpoints.fingerprint(qa_pair) if checkpoints else None
+            result = checkpoints.load(fingerprint) if checkpoints else None
+            if result is not None:
+                log(f"Task {i + 1}: Reusing checkpointed result {fingerprint[:12]}")
+            else:
+                async def evaluate(trial_log: Callable[[str], None]) -> dict[str, Any]:
+                    tracking = client.track_task() if isinstance(client, BatchingClient) else contextlib.nullcontext()
+                    async with tracking:
+                        return await evaluate_single_task(
+                            client, model, qa_pair, tools, connection, i, log=trial_log, prompt_caching=prompt_caching,
+                            **(loop_options or {}),
+                        )
+
+                if trial_policy:
+                    result = await run_trials(evaluate, trial_policy, log=log)
+                else:
+                    result = await evaluate(log)
+                # Tasks whose model request failed are not stored, so a resumed run retries them
+                if checkpoints and not result.get("error"):
+                    checkpoints.save(fingerprint, result)
+        finally:
+            # Printed even if the task raises, since that is when its log is needed
+            if output:
+                print("\n".join(output))
+
+        result["queue_wait"] = queue_wait
+        totals.add(result)
+        metrics.add_result(result)
+        if sink:
+            sink.write(i, result)
+            return None
+        return result
+
+    results = await schedule_tasks(qa_pairs, run_task, concurrency, shard=shard)
+
+    rate_limiter = (loop_options or {}).get("rate_limiter")
+    report = format_summary(
+        totals,
+        metrics,
+        tool_cache_stats=connection.cache.stats if isinstance(connection, CachedMCPConnection) else None,
+        rate_limit_stats=rate_limit_summary(rate_limiter) if rate_limiter else None,
     )
 
-    report += "".join([
-        TASK_TEMPLATE.format(
-            task_num=i + 1,
-            question=qa_pair["question"],
-            expected_answer=qa_pair["answer"],
-            actual_answer=result["actual"] or "N/A",
-            correct_indicator="✅" if result["score"] else "❌",
-            total_duration=result["total_duration"],
-            tool_calls=json.dumps(result["tool_calls"], indent=2),
-            summary=result["summary"] or "N/A",
-            feedback=result["feedback"] or "N/A",
-        )
-        for i, (qa_pair, result) in enumerate(zip(qa_pairs, results))
-    ])
+    if sink:
+        sink.close(summary=report)
+        report += "".join(format_task_section(i, result) for i, result in sink.read_results())
+    else:
+        first, step = shard or (0, 1)
+        report += "".join(format_task_section(first + k * step, result) for k, result in enumerate(results))
 
     return report
 
@@ -334,17 +1003,126 @@ Examples:
 
     parser.add_argument("-o", "--output", type=Path, help="Output file for evaluation report (default: stdout)")
 
+    perf_group = parser.add_argument_group("performance options")
+    perf_group.add_argument("--workers", type=int, default=1, help="Shard tasks across this many worker processes, each with its own MCP server (default: 1)")
+    perf_group.add_argument("--mcp-sessions", type=int, default=1, help="Open this many MCP sessions per worker and send each tool call to the least busy one (default: 1)")
+    perf_group.add_argument("--concurrency", type=int, help="Maximum number of tasks to run at once per worker (default: 1, or 1000 with --batch)")
+    perf_group.add_argument("--stream", action="store_true", help="Parse the evaluation file incrementally and start tasks as QA pairs are read")
+    perf_group.add_argument("--results", type=Path, metavar="JSONL", help="Append each finished task to this JSONL file as it completes")
+    perf_group.add_argument("--live-report", type=Path, metavar="MARKDOWN", help="Append each finished task to this Markdown file as it completes (requires --results)")
+    perf_group.add_argument("--resume", type=Path, metavar="DIR", help="Store finished tasks in this checkpoint directory and skip tasks it already holds")
+    perf_group.add_argument("--metrics-json", type=Path, metavar="PATH", help="Write latency and token metrics as JSON")
+    perf_group.add_argument("--metrics-prom", type=Path, metavar="PATH", help="Write latency and token metrics in Prometheus text format")
+    perf_group.add_argument("--max-turns", type=int, help="Stop a task after this many model turns")
+    perf_group.add_argument("--max-task-tokens", type=int, help="Stop a task once it has used this many input plus output tokens")
+    perf_group.add_argument("--compact-threshold", type=int, metavar="BYTES", help="Truncate older tool results to this many bytes before each model call")
+    perf_group.add_argument("--compact-keep-recent", type=int, default=1, metavar="TURNS", help="Number of most recent tool turns never compacted (default: 1)")
+    perf_group.add_argument("--rpm", type=float, help="Maximum model requests per minute")
+    perf_group.add_argument("--tpm", type=float, help="Maximum model tokens (input plus output) per minute")
+    perf_group.add_argument("--max-retries", type=int, help="Retry throttled and transient model errors with jittered exponential backoff this many times (default: 6 when rate limiting)")
+    perf_group.add_argument("--adaptive-concurrency", action="store_true", help="Adapt in-flight model requests to throttling (AIMD), up to --concurrency")
+    perf_group.add_argument("--batch", choices=["api", "local"], help="Advance all running tasks one turn at a time, sending each turn's model requests as one batch through the Message Batches API or a local stand-in")
+    perf_group.add_argument("--batch-poll-interval", type=float, default=5.0, metavar="SECONDS", help="Seconds between Message Batches status checks (default: 5)")
+    perf_group.add_argument("--trials", type=int, default=1, help="Run up to this many trials per question, stopping early once its pass rate is decided (default: 1)")
+    perf_group.add_argument("--trial-confidence", type=float, default=0.95, help="Confidence level of the pass rate intervals (default: 0.95)")
+    perf_group.add_argument("--pass-threshold", type=float, default=0.5, help="Pass rate a question's interval is compared with to decide it (default: 0.5)")
+    perf_group.add_argument("--prompt-caching", action="store_true", help="Mark the system prompt and tool definitions as cacheable")
+    perf_group.add_argument("--tool-cache", action="store_true", help="Memoize results of repeated tool calls (tools must be read-only)")
+    perf_group.add_argument("--tool-cache-dir", type=Path, help="Persist cached tool results in this directory across runs (implies --tool-cache)")
+    perf_group.add_argument("--tool-cache-max-mb", type=float, default=64, help="In-memory tool cache size limit in MB (default: 64)")
+    perf_group.add_argument("--tool-cache-allow", nargs="+", metavar="PATTERN", help="Only cache tools matching these patterns, e.g. 'search_*'")
+    perf_group.add_argument("--tool-cache-deny", nargs="+", metavar="PATTERN", help="Never cache tools matching these patterns")
+    perf_group.add_argument("--async-client", action="store_true", help="Use the async Anthropic client with a shared HTTP connection pool")
+    perf_group.add_argument("--max-connections", type=int, default=100, help="Connection pool size for --async-client (default: 100)")
+    perf_group.add_argument("--keepalive-expiry", type=float, default=30.0, help="Seconds to keep idle pooled connections alive (default: 30)")
+
+    cassette_group = parser.add_argument_group("record/replay options").add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", type=Path, metavar="DIR", help="Record all model requests and tool results into a cassette directory")
+    cassette_group.add_argument("--replay", type=Path, metavar="DIR", help="Replay a recorded cassette offline, without a model endpoint or MCP server")
+
     args = parser.parse_args()
 
     if not args.eval_file.exists():
         print(f"Error: Evaluation file not found: {args.eval_file}")
         sys.exit(1)
 
+    if args.live_report and not args.results:
+        print("Error: --live-report requires --results")
+        sys.exit(1)
+
+    if args.batch == "api" and (args.record or args.replay):
+        print("Error: --batch api cannot be combined with --record/--replay; use --batch local")
+        sys.exit(1)
+
+    if args.batch and args.adaptive_concurrency:
+        # A batch is sent once every running task has a request pending, so tasks held back by the limiter would stall it
+        print("Error: --batch cannot be combined with --adaptive-concurrency")
+        sys.exit(1)
+
+    if args.workers < 1 or args.mcp_sessions < 1 or args.trials < 1:
+        print("Error: --workers, --mcp-sessions and --trials must be at least 1")
+        sys.exit(1)
+
+    if not 0 < args.trial_confidence < 1 or not 0 < args.pass_threshold < 1:
+        print("Error: --trial-confidence and --pass-threshold must be between 0 and 1")
+        sys.exit(1)
+
+    if args.concurrency is None:
+        args.concurrency = BATCH_CONCURRENCY if args.batch else 1
+
+    sink = ResultSink(args.results, args.live_report) if args.results else None
+    metrics = MetricsCollector()
+
+    try:
+        if args.workers > 1:
+            report = await run_workers(args, sink, metrics)
+        else:
+            report, _ = await evaluate_from_args(args, sink, metrics)
+    except EvaluationFileError as e:
+        print(f"Error parsing evaluation file {args.eval_file}: {e}")
+        sys.exit(1)
+
+    if args.metrics_json:
+        args.metrics_json.write_text(metrics.to_json())
+    if args.metrics_prom:
+        args.metrics_prom.write_text(metrics.to_prometheus())
+
+    if args.output:
+        args.output.write_text(report)
+        print(f"\n✅ Report saved to {args.output}")
+    else:
+        print("\n" + report)
+
+
+async def evaluate_from_args(
+    args: argparse.Namespace,
+    sink: ResultSink | None,
+    metrics: MetricsCollector,
+    shard: tuple[int, int] | None = None,
+) -> tuple[str, dict[str, Any]]:
+    """Set up the connection and client described by ``args`` and run the evaluation.
+
+    Returns the report and the run-wide counters (tool cache, rate limiting,
+    batching) that ``run_workers`` merges across workers. Each worker process
+    calls this with its ``shard`` and gets its own MCP server and client.
+    """
     headers = parse_headers(args.headers) if args.headers else None
     env_vars = parse_env_vars(args.env) if args.env else None
 
-    try:
-        connection = create_connection(
+    cassette = None
+    if args.record or args.replay:
+        try:
+            cassette = Cassette(args.record or args.replay, replay=bool(args.replay))
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    pool = None
+    if args.replay:
+        connection = CassetteConnection(None, cassette)
+    else:
+        connect = functools.partial(
+            create_connection,
             transport=args.transport,
             command=args.command,
             args=args.args,
@@ -352,21 +1130,273 @@ Examples:
             url=args.url,
             headers=headers,
         )
-    except ValueError as e:
-        print(f"Error: {e}")
-        sys.exit(1)
+        try:
+            connection = connect()
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+        if args.mcp_sessions > 1:
+            connection = pool = MCPConnectionPool(connect, size=args.mcp_sessions)
+        if cassette:
+            connection = CassetteConnection(connection, cassette)
+
+    if args.tool_cache or args.tool_cache_dir:
+        cache = ToolResultCache(
+            max_bytes=int(args.tool_cache_max_mb * 1024 * 1024),
+            directory=args.tool_cache_dir,
+            allow=args.tool_cache_allow,
+            deny=args.tool_cache_deny,
+        )
+        connection = CachedMCPConnection(connection, cache)
+
+    if args.replay:
+        print(f"📼 Replaying cassette {args.replay}...")
+    else:
+        print(f"🔗 Connecting to MCP server via {args.transport}...")
+
+    rate_limiter = None
+    if args.rpm or args.tpm or args.max_retries is not None or args.adaptive_concurrency:
+        # Workers share the account's budgets, so each one gets an equal part.
+        workers = shard[1] if shard else 1
+        rate_limiter = RateLimiter(
+            requests_per_minute=args.rpm / workers if args.rpm else None,
+            tokens_per_minute=args.tpm / workers if args.tpm else None,
+            max_retries=6 if args.max_retries is None else args.max_retries,
+            concurrency=AdaptiveConcurrency(max(1, args.concurrency)) if args.adaptive_concurrency else None,
+        )
 
-    print(f"🔗 Connecting to MCP server via {args.transport}...")
+    startup_timings = {}
+    client_task = asyncio.create_task(timed(
+        startup_timings,
+        "model client",
+        asyncio.to_thread(create_client_from_args, args, cassette, sdk_retries=rate_limiter is None),
+    ))
+    # Parse the evaluation file while the MCP server starts, so a malformed file
+    # fails before any tool request is in flight
+    parse_task = None if args.stream else asyncio.create_task(timed(
+        startup_timings,
+        "eval file",
+        asyncio.to_thread(parse_evaluation_file, args.eval_file),
+    ))
+    parse_error = None
+    try:
+        async with contextlib.AsyncExitStack() as stack:
+            await timed(startup_timings, "MCP connect", stack.enter_async_context(connection))
+            print("✅ Connected successfully")
+            client, pooled_client = await client_task
+            if pooled_client is not None:
+                stack.push_async_callback(pooled_client.close)
+
+            try:
+                report = await run_evaluation(
+                    args.eval_file, connection, args.model, concurrency=args.concurrency, client=client,
+                    prompt_caching=args.prompt_caching, stream=args.stream, sink=sink,
+                    checkpoints=CheckpointStore(args.resume) if args.resume else None, metrics=metrics,
+                    loop_options={
+                        "max_turns": args.max_turns,
+                        "max_task_tokens": args.max_task_tokens,
+                        "compact_threshold": args.compact_threshold,
+                        "compact_keep_recent": args.compact_keep_recent,
+                        "rate_limiter": rate_limiter,
+                    },
+                    shard=shard,
+                    startup_timings=startup_timings,
+                    trial_policy=(
+                        TrialPolicy(args.trials, confidence=args.trial_confidence, threshold=args.pass_threshold)
+                        if args.trials > 1 else None
+                    ),
+                    qa_pairs=await parse_task if parse_task else None,
+                )
+            except EvaluationFileError as e:
+                # Raised through the MCP client's task group it would come out
+                # wrapped in an ExceptionGroup, so re-raise it once disconnected
+                parse_error = e
+    finally:
+        tasks = [task for task in (client_task, parse_task) if task]
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    if parse_error:
+        raise parse_error
+
+    if pool and pool.stats["replaced"]:
+        print(f"🔁 Replaced {pool.stats['replaced']} unhealthy MCP sessions ({pool.stats['retried']} tool calls retried)")
+
+    if isinstance(client, BatchingClient):
+        print(
+            f"📦 Sent {client.stats['requests']} model requests in {client.stats['batches']} batches "
+            f"(largest {client.stats['largest_batch']})"
+        )
+
+    return report, {
+        "tool_cache": connection.cache.stats if isinstance(connection, CachedMCPConnection) else None,
+        "rate_limit": rate_limit_summary(rate_limiter) if rate_limiter else None,
+    }
 
-    async with connection:
-        print("✅ Connected successfully")
-        report = await run_evaluation(args.eval_file, connection, args.model)
 
-        if args.output:
-            args.output.write_text(report)
-            print(f"\n✅ Report saved to {args.output}")
+def create_client_from_args(
+    args: argparse.Namespace,
+    cassette: Cassette | None,
+    sdk_retries: bool = True,
+) -> tuple[Any, "AsyncAnthropic | None"]:
+    """Build the model client described by ``args``.
+
+    Returns the client and, with ``--async-client``, the pooled client to
+    close at the end. Importing ``anthropic`` dominates the cost, so this
+    runs in a thread while the MCP server starts.
+    """
+    from anthropic import Anthropic
+
+    pooled_client = None
+    if args.async_client and not args.replay:
+        pooled_client = create_async_client(max_connections=args.max_connections, keepalive_expiry=args.keepalive_expiry)
+
+    client = pooled_client
+    if not sdk_retries and not args.replay:
+        # The rate limiter owns retries, so turn off the SDK's built-in ones.
+        client = (client or Anthropic()).with_options(max_retries=0)
+    if cassette:
+        client = CassetteClient(None if args.replay else client or Anthropic(), cassette)
+    if args.batch == "api":
+        client = BatchingClient(MessageBatchesBackend(client or Anthropic(), poll_interval=args.batch_poll_interval))
+    elif args.batch == "local":
+        client = BatchingClient(LocalBatchBackend(client or Anthropic()))
+    return client or Anthropic(), pooled_client
+
+
+class _PrefixedWriter:
+    """Text stream wrapper that prefixes every line, used for worker output."""
+
+    def __init__(self, stream: Any, prefix: str):
+        self.stream = stream
+        self.prefix = prefix
+        self._at_line_start = True
+
+    def write(self, text: str) -> int:
+        for line in text.splitlines(keepends=True):
+            if self._at_line_start:
+                self.stream.write(self.prefix)
+            self.stream.write(line)
+            self._at_line_start = line.endswith("\n")
+        return len(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def init_worker() -> None:
+    """Worker process initializer: ignore SIGINT while no shard is running."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def run_worker(args: argparse.Namespace, shard: tuple[int, int], results_path: Path) -> dict[str, Any]:
+    """Worker process entry point: evaluate one shard into its own JSONL file.
+
+    SIGINT cancels the evaluation, which closes the worker's MCP server.
+    """
+    sys.stdout = _PrefixedWriter(sys.stdout, f"[worker {shard[0] + 1}/{shard[1]}] ")
+    sink = ResultSink(results_path)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    try:
+        _, stats = asyncio.run(evaluate_from_args(args, sink, MetricsCollector(), shard=shard))
+    finally:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    sys.stdout.flush()
+    return stats
+
+
+def merge_worker_stats(worker_stats: list[dict[str, Any]]) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+    """Sum the tool cache and rate limiting counters of all workers."""
+    tool_cache = None
+    rate_limit = None
+    for worker, stats in enumerate(worker_stats, start=1):
+        if stats["tool_cache"] is not None:
+            tool_cache = tool_cache or {}
+            for tool_name, counters in stats["tool_cache"].items():
+                merged = tool_cache.setdefault(tool_name, {"hits": 0, "misses": 0})
+                merged["hits"] += counters["hits"]
+                merged["misses"] += counters["misses"]
+        if stats["rate_limit"] is not None:
+            if rate_limit is None:
+                rate_limit = {key: value for key, value in stats["rate_limit"].items() if key != "concurrency_limit"}
+                rate_limit["concurrency_limit"] = []
+            else:
+                for key, value in stats["rate_limit"].items():
+                    if key != "concurrency_limit":
+                        rate_limit[key] += value
+            rate_limit["concurrency_limit"].append(f"worker {worker}: {stats['rate_limit']['concurrency_limit']}")
+    if rate_limit is not None:
+        rate_limit["concurrency_limit"] = "; ".join(rate_limit["concurrency_limit"])
+    return tool_cache, rate_limit
+
+
+async def run_workers(args: argparse.Namespace, sink: ResultSink | None, metrics: MetricsCollector) -> str:
+    """Shard the evaluation across ``args.workers`` processes and merge their results.
+
+    QA pairs are dealt round-robin, and every worker starts its own MCP server
+    through ``create_connection``, so single-threaded stdio servers run in
+    parallel. Each worker streams its results to a JSONL file (next to
+    ``--results`` when given); once all workers finish, the results are
+    merged in task order into one report with combined metrics. If a worker
+    fails, the others are interrupted and the error is raised.
+    """
+    print(f"🧵 Starting {args.workers} workers")
+
+    with contextlib.ExitStack() as stack:
+        if args.results:
+            shard_dir = args.results.parent
+            shard_name = args.results.stem
         else:
-            print("\n" + report)
+            shard_dir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="mcp-eval-")))
+            shard_name = "results"
+        shard_paths = [shard_dir / f"{shard_name}.worker{index + 1}.jsonl" for index in range(args.workers)]
+
+        executor = stack.enter_context(concurrent.futures.ProcessPoolExecutor(
+            max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"), initializer=init_worker,
+        ))
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(executor, run_worker, args, (index, args.workers), path)
+            for index, path in enumerate(shard_paths)
+        ]
+        try:
+            worker_stats = await asyncio.gather(*futures)
+        except BaseException:
+            # Otherwise leaving the executor would wait for every other worker to finish its shard
+            executor.shutdown(wait=False, cancel_futures=True)
+            for process in multiprocessing.active_children():
+                os.kill(process.pid, signal.SIGINT)
+            await asyncio.gather(*futures, return_exceptions=True)
+            if args.results:
+                for path in shard_paths:
+                    path.unlink(missing_ok=True)
+            raise
+
+        records = []
+        for path in shard_paths:
+            with open(path, encoding="utf-8") as f:
+                records.extend(json.loads(line) for line in f if line.strip())
+        results = sorted(((record.pop("task_index"), record) for record in records), key=lambda item: item[0])
+
+        totals = ReportTotals()
+        for i, result in results:
+            totals.add(result)
+            metrics.add_result(result)
+            if sink:
+                sink.write(i, result)
+
+        if args.results:
+            for path in shard_paths:
+                path.unlink()
+
+    tool_cache_stats, rate_limit_stats = merge_worker_stats(worker_stats)
+    report = format_summary(totals, metrics, tool_cache_stats=tool_cache_stats, rate_limit_stats=rate_limit_stats)
+    if sink:
+        sink.close(summary=report)
+    report += "".join(format_task_section(i, result) for i, result in results)
+    return report
 
 
 if __name__ == "__main__":
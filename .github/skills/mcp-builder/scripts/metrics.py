@@ -0,0 +1,192 @@
+"""Latency and token metrics for evaluation runs.
+
+Samples are collected per phase (model turn, tool call, scheduler queue wait,
+whole task) and per tool, then summarized as percentiles and histograms for the
+Markdown report, a JSON file and the Prometheus text exposition format.
+"""
+
+import json
+import math
+from typing import Any
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+TOKEN_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, math.inf)
+
+PHASES = {
+    "model": "Model latency per turn",
+    "tool": "Tool call latency",
+    "tool_fanout": "Parallel tool fan-out per turn",
+    "queue_wait": "Scheduler queue wait per task",
+    "task": "Total task duration",
+}
+
+TOKEN_DIRECTIONS = {
+    "input": "Input tokens per turn",
+    "output": "Output tokens per turn",
+}
+
+LATENCY_TEMPLATE = """
+## Latency Breakdown
+
+| Phase | Count | p50 | p95 | p99 | Max |
+|-------|-------|-----|-----|-----|-----|
+{phase_rows}
+
+| Tool | Count | p50 | p95 | p99 | Max |
+|------|-------|-----|-----|-----|-----|
+{tool_rows}
+
+| Tokens per Turn | Count | p50 | p95 | p99 | Total |
+|-----------------|-------|-----|-----|-----|-------|
+{token_rows}
+
+### Latency Histograms
+
+```
+{histograms}
+```
+
+---
+"""
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the q-th percentile (0-100) using linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def histogram(values: list[float], buckets: tuple[float, ...]) -> list[int]:
+    """Count values into cumulative ``le`` buckets, as Prometheus does."""
+    return [sum(1 for value in values if value <= bound) for bound in buckets]
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else f"{bound:g}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsCollector:
+    """Accumulates latency and token samples from finished tasks."""
+
+    def __init__(self):
+        self.phases: dict[str, list[float]] = {phase: [] for phase in PHASES}
+        self.tools: dict[str, list[float]] = {}
+        self.tokens: dict[str, list[int]] = {direction: [] for direction in TOKEN_DIRECTIONS}
+
+    def add_result(self, result: dict[str, Any]) -> None:
+        """Record the samples of one task result."""
+        self.phases["task"].append(result["total_duration"])
+        self.phases["queue_wait"].append(result.get("queue_wait", 0.0))
+
+        for turn in result.get("turns", []):
+            self.phases["model"].append(turn["model_latency"])
+            if turn["tool_latency"]:
+                self.phases["tool_fanout"].append(turn["tool_latency"])
+            self.tokens["input"].append(turn["input_tokens"])
+            self.tokens["output"].append(turn["output_tokens"])
+
+        for tool_name, tool_metrics in result["tool_calls"].items():
+            self.phases["tool"].extend(tool_metrics["durations"])
+            self.tools.setdefault(tool_name, []).extend(tool_metrics["durations"])
+
+    @staticmethod
+    def summarize(values: list[float]) -> dict[str, float]:
+        """Summarize samples as count, sum, percentiles and max."""
+        return {
+            "count": len(values),
+            "sum": sum(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": max(values, default=0.0),
+        }
+
+    def to_json(self) -> str:
+        """Export summaries and histograms as JSON."""
+        def section(samples: dict[str, list[float]], buckets: tuple[float, ...]) -> dict[str, Any]:
+            return {
+                name: {
+                    **self.summarize(values),
+                    "histogram": {
+                        _format_bound(bound): count
+                        for bound, count in zip(buckets, histogram(values, buckets))
+                    },
+                }
+                for name, values in samples.items()
+            }
+
+        return json.dumps({
+            "phases": section(self.phases, LATENCY_BUCKETS),
+            "tools": section(self.tools, LATENCY_BUCKETS),
+            "tokens_per_turn": section(self.tokens, TOKEN_BUCKETS),
+        }, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Export histograms in the Prometheus text exposition format."""
+        lines = []
+
+        def emit(metric: str, help_text: str, label: str, samples: dict[str, list[float]], buckets: tuple[float, ...]) -> None:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for name, values in samples.items():
+                label_value = _escape_label(name)
+                for bound, count in zip(buckets, histogram(values, buckets)):
+                    lines.append(f'{metric}_bucket{{{label}="{label_value}",le="{_format_bound(bound)}"}} {count}')
+                lines.append(f'{metric}_sum{{{label}="{label_value}"}} {float(sum(values))!r}')
+                lines.append(f'{metric}_count{{{label}="{label_value}"}} {len(values)}')
+
+        emit("mcp_eval_phase_seconds", "Latency of each evaluation phase in seconds.", "phase", self.phases, LATENCY_BUCKETS)
+        emit("mcp_eval_tool_seconds", "Latency of MCP tool calls in seconds.", "tool", self.tools, LATENCY_BUCKETS)
+        emit("mcp_eval_turn_tokens", "Tokens per model turn.", "direction", self.tokens, TOKEN_BUCKETS)
+        return "\n".join(lines) + "\n"
+
+    def format_markdown(self) -> str:
+        """Render the latency breakdown section of the report."""
+        def latency_row(name: str, values: list[float]) -> str:
+            stats = self.summarize(values)
+            return (
+                f"| {name} | {stats['count']} | {stats['p50']:.3f}s | {stats['p95']:.3f}s "
+                f"| {stats['p99']:.3f}s | {stats['max']:.3f}s |"
+            )
+
+        def token_row(name: str, values: list[int]) -> str:
+            stats = self.summarize(values)
+            return (
+                f"| {name} | {stats['count']} | {stats['p50']:.0f} | {stats['p95']:.0f} "
+                f"| {stats['p99']:.0f} | {stats['sum']:.0f} |"
+            )
+
+        phase_rows = [latency_row(PHASES[phase], values) for phase, values in self.phases.items()]
+        tool_rows = [latency_row(tool_name, values) for tool_name, values in sorted(self.tools.items())]
+        token_rows = [token_row(TOKEN_DIRECTIONS[direction], values) for direction, values in self.tokens.items()]
+
+        histograms = []
+        labelled = [(PHASES[phase], values) for phase, values in self.phases.items()]
+        labelled += [(f"tool {tool_name}", values) for tool_name, values in sorted(self.tools.items())]
+        for name, values in labelled:
+            if not values:
+                continue
+            histograms.append(name)
+            previous = 0
+            for index, (bound, cumulative) in enumerate(zip(LATENCY_BUCKETS, histogram(values, LATENCY_BUCKETS))):
+                count = cumulative - previous
+                previous = cumulative
+                label = f"<= {bound:g}s" if bound != math.inf else f"> {LATENCY_BUCKETS[index - 1]:g}s"
+                bar = "#" * math.ceil(count / len(values) * 40)
+                histograms.append(f"  {label:>9} {count:6d} {bar}")
+
+        return LATENCY_TEMPLATE.format(
+            phase_rows="\n".join(phase_rows),
+            tool_rows="\n".join(tool_rows) or "| (no tool calls) | 0 | - | - | - | - |",
+            token_rows="\n".join(token_rows),
+            histograms="\n".join(histograms) or "(no samples)",
+        )
@@ -0,0 +1,203 @@
+"""Rate-limit-aware scheduling of model requests.
+
+``RateLimiter`` keeps requests within requests-per-minute and tokens-per-minute
+budgets using token buckets, retries throttled or transient failures with
+jittered exponential backoff, and adapts the number of in-flight requests with
+additive increase / multiplicative decrease (AIMD) based on observed throttling.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+THROTTLE_STATUS_CODES = {429, 529}
+RETRYABLE_STATUS_CODES = THROTTLE_STATUS_CODES | {500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate_per_minute``.
+
+    The level may go negative when actual usage turns out higher than
+    estimated; later acquisitions then wait until the debt is repaid.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float | None = None):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float) -> float:
+        """Wait until ``amount`` tokens are available and take them; returns the time waited."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self.level < amount:
+                delay = (amount - self.level) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.level -= amount
+        return waited
+
+    def adjust(self, amount: float) -> None:
+        """Take (or return, if negative) tokens without waiting."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class AdaptiveConcurrency:
+    """Concurrency limit driven by additive increase / multiplicative decrease.
+
+    Each success raises the limit by ``1 / limit`` (about one slot per round of
+    requests); a throttling error halves it, at most once per ``cooldown``
+    seconds so that one burst of rejections counts as a single signal.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int | None = None, cooldown: float = 2.0):
+        self.minimum = minimum
+        self.maximum = maximum or initial
+        self.limit = float(max(minimum, min(initial, self.maximum)))
+        self.cooldown = cooldown
+        self.lowest = self.limit
+        self.in_flight = 0
+        self._last_decrease = float("-inf")
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot under the current limit."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        """Free a slot."""
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def on_success(self) -> None:
+        """Additively increase the limit."""
+        async with self._condition:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+    def on_throttle(self) -> None:
+        """Multiplicatively decrease the limit."""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit / 2)
+        self.lowest = min(self.lowest, self.limit)
+
+
+def classify_error(error: BaseException) -> tuple[bool, bool]:
+    """Return ``(retryable, throttled)`` for an exception from messages.create."""
+    from anthropic import APIConnectionError, APIStatusError
+
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES, error.status_code in THROTTLE_STATUS_CODES
+    if isinstance(error, APIConnectionError):
+        return True, False
+    return False, False
+
+
+def retry_after(error: BaseException) -> float | None:
+    """Read a ``retry-after`` delay in seconds from an API error, if present."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """Runs model requests within RPM/TPM budgets, with retries and AIMD concurrency."""
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        concurrency: AdaptiveConcurrency | None = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.concurrency = concurrency
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0, "budget_wait": 0.0, "backoff_wait": 0.0}
+
+    def backoff_delay(self, attempt: int, error: BaseException) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's retry-after."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after(error) or 0.0)
+
+    async def call(self, request: Callable[[], Awaitable[T]], estimated_tokens: int = 0) -> T:
+        """Run ``request`` once budgets allow, retrying retryable failures."""
+        attempt = 0
+        while True:
+            if self.requests:
+                self.stats["budget_wait"] += await self.requests.acquire(1)
+            if self.tokens:
+                self.stats["budget_wait"] += await self.tokens.acquire(estimated_tokens)
+            if self.concurrency:
+                await self.concurrency.acquire()
+
+            self.stats["requests"] += 1
+            try:
+                response = await request()
+            except Exception as e:
+                error = e
+            else:
+                error = None
+            finally:
+                if self.concurrency:
+                    await self.concurrency.release()
+
+            if error is None:
+                if self.concurrency:
+                    await self.concurrency.on_success()
+                if self.tokens:
+                    self.tokens.adjust(self._actual_tokens(response) - estimated_tokens)
+                return response
+
+            if self.tokens:
+                self.tokens.adjust(-estimated_tokens)
+            retryable, throttled = classify_error(error)
+            if throttled:
+                self.stats["throttled"] += 1
+                if self.concurrency:
+                    self.concurrency.on_throttle()
+            if not retryable or attempt == self.max_retries:
+                self.stats["failures"] += 1
+                raise error
+
+            delay = self.backoff_delay(attempt, error)
+            self.stats["retries"] += 1
+            self.stats["backoff_wait"] += delay
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _actual_tokens(response: Any) -> int:
+        usage = getattr(response, "usage", None)
+        return sum(
+            getattr(usage, field, None) or 0
+            for field in ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+        )
@@ -0,0 +1,148 @@
+"""Repeated trials per question with confidence intervals and early stopping.
+
+A question's trials run in concurrent waves. After each wave the Wilson score
+interval of its pass rate is compared with the pass threshold; once the
+interval lies entirely above or below it the question is decided and its
+remaining trials are skipped. Each wave is as small as it can be while still
+able to decide the question if all of its trials agree.
+"""
+
+import asyncio
+import math
+import statistics
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable
+
+TRIALS_TEMPLATE = """
+## Repeated Trials
+
+- **Trials Run**: {trials_run} of {trials_budget} ({trials_skipped} skipped by early stopping)
+- **Mean Pass Rate**: {mean_pass_rate:.1f}%
+- **Decided**: {decided_pass} pass, {decided_fail} fail, {undecided} undecided (flaky) at {confidence:.0%} confidence
+
+---
+"""
+
+
+def wilson_interval(passes: int, trials: int, confidence: float = 0.95) -> tuple[float, float]:
+    """Wilson score interval for a pass rate of ``passes`` out of ``trials``."""
+    if trials == 0:
+        return 0.0, 1.0
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = passes / trials
+    denominator = 1 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+class TrialPolicy:
+    """Decides how many trials a question needs.
+
+    A question is decided once the Wilson interval of its pass rate at
+    ``confidence`` excludes ``threshold``; at most ``trials`` are run.
+    """
+
+    def __init__(self, trials: int, confidence: float = 0.95, threshold: float = 0.5):
+        self.trials = trials
+        self.confidence = confidence
+        self.threshold = threshold
+
+    def verdict(self, passes: int, trials: int) -> bool | None:
+        """True or False once the pass rate is decisively above or below the threshold, else None."""
+        low, high = wilson_interval(passes, trials, self.confidence)
+        if low > self.threshold:
+            return True
+        if high < self.threshold:
+            return False
+        return None
+
+    def next_wave(self, passes: int, trials: int) -> int:
+        """Number of trials to start next; 0 when the question is decided or the budget is spent."""
+        remaining = self.trials - trials
+        if remaining <= 0 or self.verdict(passes, trials) is not None:
+            return 0
+        for wave in range(1, remaining + 1):
+            if self.verdict(passes + wave, trials + wave) is not None or self.verdict(passes, trials + wave) is not None:
+                return wave
+        return remaining
+
+
+def combine_trials(results: list[dict[str, Any]], policy: TrialPolicy, duration: float) -> dict[str, Any]:
+    """Merge per-trial results into one task result with pass rate and interval."""
+    passes = sum(result["score"] for result in results)
+    pass_rate = passes / len(results)
+    low, high = wilson_interval(passes, len(results), policy.confidence)
+    actual = Counter(result["actual"] for result in results).most_common(1)[0][0]
+    representative = next(result for result in results if result["actual"] == actual)
+
+    tool_calls: dict[str, dict[str, Any]] = {}
+    for result in results:
+        for tool_name, metrics in result["tool_calls"].items():
+            merged = tool_calls.setdefault(tool_name, {"count": 0, "durations": []})
+            merged["count"] += metrics["count"]
+            merged["durations"].extend(metrics["durations"])
+
+    return {
+        "question": representative["question"],
+        "expected": representative["expected"],
+        "actual": actual,
+        "score": int(pass_rate > policy.threshold),
+        "total_duration": duration,
+        "tool_calls": tool_calls,
+        "num_tool_calls": sum(result["num_tool_calls"] for result in results),
+        "tool_wall_time": sum(result["tool_wall_time"] for result in results),
+        "tool_time_saved": sum(result["tool_time_saved"] for result in results),
+        "usage": {field: sum(result["usage"][field] for result in results) for field in representative["usage"]},
+        "turns": [turn for result in results for turn in result["turns"]],
+        "turns_used": sum(result["turns_used"] for result in results),
+        "stop_reason": ", ".join(sorted({result["stop_reason"] for result in results if result["stop_reason"]})),
+        "error": next((result["error"] for result in results if result.get("error")), None),
+        "compacted_bytes": sum(result["compacted_bytes"] for result in results),
+        "summary": representative["summary"],
+        "feedback": representative["feedback"],
+        "trials": [
+            {
+                "score": result["score"],
+                "actual": result["actual"],
+                "total_duration": result["total_duration"],
+                "num_tool_calls": result["num_tool_calls"],
+            }
+            for result in results
+        ],
+        "trials_budget": policy.trials,
+        "pass_rate": pass_rate,
+        "ci_low": low,
+        "ci_high": high,
+        "confidence": policy.confidence,
+        "decided": policy.verdict(passes, len(results)),
+    }
+
+
+async def run_trials(
+    evaluate: Callable[[Callable[[str], None]], Awaitable[dict[str, Any]]],
+    policy: TrialPolicy,
+    log: Callable[[str], None] = print,
+) -> dict[str, Any]:
+    """Run trials of one question in concurrent waves until it is decided.
+
+    ``evaluate`` runs a single trial and receives the log function to use.
+    """
+    start_time = time.perf_counter()
+    results: list[dict[str, Any]] = []
+    while wave := policy.next_wave(sum(result["score"] for result in results), len(results)):
+        first = len(results)
+        results += await asyncio.gather(*(
+            evaluate(lambda message, trial=first + k: log(f"[trial {trial + 1}] {message}"))
+            for k in range(wave)
+        ))
+
+    combined = combine_trials(results, policy, time.perf_counter() - start_time)
+    skipped = policy.trials - len(results)
+    log(
+        f"Trials: {sum(result['score'] for result in results)}/{len(results)} passed "
+        f"({combined['ci_low']:.0%}-{combined['ci_high']:.0%} at {policy.confidence:.0%} confidence)"
+        + (f", {skipped} skipped by early stopping" if skipped else "")
+    )
+    return combined
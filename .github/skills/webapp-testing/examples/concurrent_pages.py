@@ -0,0 +1,45 @@
+import asyncio
+import os
+import sys
+
+# Example: Checking many pages concurrently with one shared browser
+
+# browser_pool.py lives in the skill's scripts/ directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+from browser_pool import BrowserPool
+
+base_url = 'http://localhost:5173'  # Replace with your URL
+paths = ['/', '/about', '/dashboard', '/settings', '/login']
+
+
+async def check_page(page, path):
+    # Each page gets its own fresh context: no cookies or storage shared between checks
+    console_errors = []
+    page.on('console', lambda msg: console_errors.append(msg.text) if msg.type == 'error' else None)
+
+    await page.goto(base_url + path)
+    await page.wait_for_load_state('networkidle')
+
+    name = path.strip('/') or 'home'
+    await page.screenshot(path=f'/tmp/page_{name}.png', full_page=True)
+    return {
+        'path': path,
+        'title': await page.title(),
+        'buttons': await page.locator('button').count(),
+        'console_errors': console_errors,
+    }
+
+
+async def main():
+    # One Chromium launch serves every page; at most 4 pages are open at once
+    async with BrowserPool(max_concurrency=4, context_options={'viewport': {'width': 1920, 'height': 1080}}) as pool:
+        results = await pool.map(check_page, paths)
+
+    for result in results:
+        print(f"{result['path']}: {result['title']!r}, {result['buttons']} buttons, {len(result['console_errors'])} console errors")
+        for error in result['console_errors']:
+            print(f"    {error}")
+    print("\nScreenshots saved to /tmp/page_*.png")
+
+
+asyncio.run(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Share one headless Chromium between many concurrent automation tasks.
+
+Launching Chromium dominates the run time of short automation scripts.
+BrowserPool launches it once and hands each task a fresh BrowserContext (its
+own cookies, storage and cache), with at most ``max_concurrency`` contexts
+open at a time. The browser is relaunched after ``max_uses`` contexts, when
+its memory use exceeds ``max_memory_mb``, or if it crashes; tasks still using
+the old browser finish on it before it is closed.
+
+Usage:
+    import asyncio
+    import sys
+    sys.path.insert(0, 'path/to/webapp-testing/scripts')
+    from browser_pool import BrowserPool
+
+    async def check(pool, url):
+        async with pool.page() as page:
+            await page.goto(url)
+            await page.wait_for_load_state('networkidle')
+            return await page.title()
+
+    async def main():
+        async with BrowserPool(max_concurrency=4) as pool:
+            titles = await asyncio.gather(*(check(pool, url) for url in urls))
+
+    asyncio.run(main())
+
+    # Or from the command line: screenshot several pages concurrently
+    python scripts/browser_pool.py http://localhost:5173 http://localhost:5173/about
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+
+
+def process_rss_bytes(pid):
+    """Resident memory of a process in bytes, or None if it cannot be read."""
+    try:
+        with open(f'/proc/{pid}/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except Exception:
+        return None
+
+
+class _PooledBrowser:
+    def __init__(self, browser):
+        self.browser = browser
+        self.uses = 0
+        self.active = 0
+        self.retired = False
+
+
+class BrowserPool:
+    """One shared Chromium that hands out isolated BrowserContexts.
+
+    ``launch_options`` go to ``chromium.launch`` (headless by default) and
+    ``context_options`` to every ``new_context`` call. Memory is the resident
+    memory summed over the browser's processes, checked at most every
+    ``memory_check_interval`` seconds; 0 for ``max_uses`` or
+    ``max_memory_mb`` disables that limit.
+    """
+
+    def __init__(
+        self,
+        max_concurrency=4,
+        max_uses=100,
+        max_memory_mb=1024,
+        memory_check_interval=5.0,
+        launch_options=None,
+        context_options=None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self.memory_check_interval = memory_check_interval
+        self.launch_options = {'headless': True, **(launch_options or {})}
+        self.context_options = context_options or {}
+        self.stats = {
+            'launches': 0,
+            'contexts': 0,
+            'recycled_uses': 0,
+            'recycled_memory': 0,
+            'crashes': 0,
+            'peak_memory_mb': 0.0,
+            'launch_seconds': 0.0,
+        }
+        self._playwright = None
+        self._current = None
+        self._retired = set()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+        self._last_memory_check = 0.0
+
+    async def __aenter__(self):
+        self._playwright = await async_playwright().start()
+        async with self._lock:
+            self._current = await self._launch()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close every browser and stop Playwright."""
+        pooled = [p for p in [self._current, *self._retired] if p is not None]
+        self._current = None
+        self._retired.clear()
+        for p in pooled:
+            await self._close_browser(p)
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    @asynccontextmanager
+    async def context(self, **options):
+        """Yield a fresh BrowserContext, closed again on exit.
+
+        Waits while ``max_concurrency`` contexts are already open. ``options``
+        override the pool's ``context_options`` for this context.
+        """
+        async with self._semaphore:
+            pooled = await self._acquire()
+            try:
+                context = await pooled.browser.new_context(**{**self.context_options, **options})
+                self.stats['contexts'] += 1
+                try:
+                    yield context
+                finally:
+                    await context.close()
+            finally:
+                await self._release(pooled)
+
+    @asynccontextmanager
+    async def page(self, **options):
+        """Yield a new page in its own fresh BrowserContext."""
+        async with self.context(**options) as context:
+            yield await context.new_page()
+
+    async def map(self, fn, items, **options):
+        """Run ``await fn(page, item)`` for every item concurrently; return the results in order."""
+        async def run(item):
+            async with self.page(**options) as page:
+                return await fn(page, item)
+
+        return await asyncio.gather(*(run(item) for item in items))
+
+    async def memory_mb(self, pooled=None):
+        """Resident memory of a browser (the current one by default) in MB, or None if unknown."""
+        pooled = pooled or self._current
+        try:
+            cdp = await pooled.browser.new_browser_cdp_session()
+            try:
+                info = await cdp.send('SystemInfo.getProcessInfo')
+            finally:
+                await cdp.detach()
+        except Exception:
+            return None
+        sizes = [process_rss_bytes(process['id']) for process in info.get('processInfo', [])]
+        sizes = [size for size in sizes if size is not None]
+        return sum(sizes) / (1024 * 1024) if sizes else None
+
+    async def _launch(self):
+        start_time = time.perf_counter()
+        browser = await self._playwright.chromium.launch(**self.launch_options)
+        self.stats['launches'] += 1
+        self.stats['launch_seconds'] += time.perf_counter() - start_time
+        self._last_memory_check = time.time()
+        return _PooledBrowser(browser)
+
+    async def _acquire(self):
+        async with self._lock:
+            if self._playwright is None:
+                raise RuntimeError("BrowserPool is not open; use 'async with BrowserPool() as pool'")
+
+            reason = None
+            current = self._current
+            if not current.browser.is_connected():
+                reason = 'crashes'
+            elif self.max_uses and current.uses >= self.max_uses:
+                reason = 'recycled_uses'
+            elif self.max_memory_mb and time.time() - self._last_memory_check >= self.memory_check_interval:
+                self._last_memory_check = time.time()
+                memory = await self.memory_mb(current)
+                if memory is not None:
+                    self.stats['peak_memory_mb'] = max(self.stats['peak_memory_mb'], memory)
+                    if memory > self.max_memory_mb:
+                        reason = 'recycled_memory'
+
+            if reason:
+                self.stats[reason] += 1
+                await self._retire(current)
+                self._current = await self._launch()
+
+            self._current.uses += 1
+            self._current.active += 1
+            return self._current
+
+    async def _release(self, pooled):
+        pooled.active -= 1
+        if pooled.retired and pooled.active == 0 and pooled in self._retired:
+            self._retired.discard(pooled)
+            await self._close_browser(pooled)
+
+    async def _retire(self, pooled):
+        pooled.retired = True
+        if pooled.active:
+            # Closed by _release once its last context is done
+            self._retired.add(pooled)
+        else:
+            await self._close_browser(pooled)
+
+    async def _close_browser(self, pooled):
+        try:
+            await pooled.browser.close()
+        except Exception:
+            # Already gone, e.g. after a crash
+            pass
+
+
+async def screenshot_urls(urls, out_dir, concurrency, max_uses, max_memory_mb):
+    os.makedirs(out_dir, exist_ok=True)
+
+    async def capture(page, item):
+        i, url = item
+        start_time = time.perf_counter()
+        await page.goto(url)
+        await page.wait_for_load_state('networkidle')
+        path = os.path.join(out_dir, f'page_{i+1}.png')
+        await page.screenshot(path=path, full_page=True)
+        print(f"[{i+1}] {url} -> {path} ({await page.title()!r}, {time.perf_counter() - start_time:.1f}s)")
+
+    async with BrowserPool(max_concurrency=concurrency, max_uses=max_uses, max_memory_mb=max_memory_mb) as pool:
+        start_time = time.perf_counter()
+        await pool.map(capture, list(enumerate(urls)), viewport={'width': 1920, 'height': 1080})
+        elapsed = time.perf_counter() - start_time
+        stats = pool.stats
+        print(
+            f"\nCaptured {len(urls)} page(s) in {elapsed:.1f}s using {stats['launches']} browser launch(es) "
+            f"({stats['launch_seconds']:.1f}s launching, {stats['recycled_uses'] + stats['recycled_memory']} recycled)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Screenshot pages concurrently using one shared Chromium')
+    parser.add_argument('urls', nargs='+', help='URLs to open')
+    parser.add_argument('--out-dir', default='/tmp/browser_pool', help='Directory for screenshots (default: /tmp/browser_pool)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Pages open at once (default: 4)')
+    parser.add_argument('--max-uses', type=int, default=100, help='Contexts per browser before it is relaunched; 0 for no limit (default: 100)')
+    parser.add_argument('--max-memory-mb', type=int, default=1024, help='Browser memory in MB that triggers a relaunch; 0 for no limit (default: 1024)')
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        print("Error: --concurrency must be at least 1")
+        sys.exit(1)
+
+    asyncio.run(screenshot_urls(args.urls, args.out_dir, args.concurrency, args.max_uses, args.max_memory_mb))
+
+
+if __name__ == '__main__':
+    main()
@@ -7,36 +7,727 @@ Usage:
     python scripts/with_server.py --server "npm run dev" --port 5173 -- python automation.py
     python scripts/with_server.py --server "npm start" --port 3000 -- python test.py
 
-    # Multiple servers
+    # Multiple servers (started concurrently)
     python scripts/with_server.py \
       --server "cd backend && python server.py" --port 3000 \
       --server "cd frontend && npm run dev" --port 5173 \
       -- python test.py
+
+    # Start the frontend only once the backend on port 3000 is ready
+    python scripts/with_server.py \
+      --server "cd backend && python server.py" --port 3000 \
+      --server "cd frontend && npm run dev" --port 5173 \
+      --depends-on 5173:3000 \
+      -- python test.py
+
+    # Wait for an HTTP health check, or for a line in the server's log
+    python scripts/with_server.py \
+      --server "cd backend && python server.py" --port 3000 --ready 3000:http:/health \
+      --server "cd frontend && npm run dev" --port 5173 --ready "5173:log:Local:.*5173" \
+      -- python test.py
+
+    # Echo server output as it arrives and keep a log file per server
+    python scripts/with_server.py --server "npm run dev" --port 5173 \
+      --stream-logs --log-dir /tmp/server-logs -- python test.py
+
+    # Run a command as 4 concurrent shards (SHARD_INDEX/SHARD_COUNT are set,
+    # and {shard_number}/{shard_count} in the command are filled in)
+    python scripts/with_server.py --server "npm run dev" --port 5173 --shards 4 \
+      -- npx playwright test --shard={shard_number}/{shard_count}
+
+    # Run several commands concurrently against the same servers
+    python scripts/with_server.py --server "npm run dev" --port 5173 \
+      --run "python test_login.py" --run "python test_checkout.py"
+
+    # Keep servers warm between runs: the first --daemon call starts them in
+    # the background, later calls reuse them; --attach only reuses them
+    python scripts/with_server.py --daemon --server "npm run dev" --port 5173 -- python test.py
+    python scripts/with_server.py --attach -- python test.py
+    python scripts/with_server.py --stop
 """
 
 import subprocess
 import socket
+import socketserver
+import http.client
+import json
+import re
+import signal
+import tempfile
+import threading
 import time
 import sys
+import os
 import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-def is_server_ready(port, timeout=30):
-    """Wait for server to be ready by polling the port."""
-    start_time = time.time()
-    while time.time() - start_time < timeout:
+# Longest chunk read as one line, so output without newlines stays bounded
+MAX_LINE_BYTES = 64 * 1024
+
+HAS_PROCESS_GROUPS = hasattr(os, 'killpg')
+
+# Readiness polling starts fast and backs off to this interval
+INITIAL_POLL_INTERVAL = 0.01
+MAX_POLL_INTERVAL = 0.5
+
+# --stop waits this long beyond --shutdown-grace for the daemon to finish teardown
+STOP_MARGIN = 10
+
+_print_lock = threading.Lock()
+
+
+def log(message):
+    """Print from any thread without interleaving lines."""
+    with _print_lock:
+        print(message, flush=True)
+
+
+class ServerOutput:
+    """Drains a server's stdout and stderr on background threads.
+
+    Reading the pipes continuously keeps a chatty server from blocking once
+    the OS pipe buffer is full. The last ``tail_lines`` lines are kept for
+    error reports; every line can also be echoed with a prefix and/or
+    written to ``log_path``.
+    """
+
+    def __init__(self, process, name, tail_lines=50, stream=False, log_path=None, ready_pattern=None):
+        self.name = name
+        self.stream = stream
+        self.ready_pattern = ready_pattern
+        self.matched = threading.Event()
+        self.lines = deque(maxlen=tail_lines)
+        self.log_file = open(log_path, 'w', buffering=1, encoding='utf-8') if log_path else None
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._drain, args=(pipe,), daemon=True)
+            for pipe in (process.stdout, process.stderr)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _drain(self, pipe):
+        for raw in iter(lambda: pipe.readline(MAX_LINE_BYTES), b''):
+            line = raw.decode(errors='replace').rstrip('\r\n')
+            with self._lock:
+                self.lines.append(line)
+                if self.log_file:
+                    self.log_file.write(line + '\n')
+            if self.ready_pattern and not self.matched.is_set() and self.ready_pattern.search(line):
+                self.matched.set()
+            if self.stream:
+                log(f"[{self.name}] {line}")
+        pipe.close()
+
+    def tail(self):
+        """Return the most recent lines of output."""
+        with self._lock:
+            return list(self.lines)
+
+    def close(self, timeout=1):
+        """Wait briefly for the pipes to reach EOF, then close the log file."""
+        for thread in self._threads:
+            thread.join(timeout)
+        with self._lock:
+            if self.log_file:
+                self.log_file.close()
+                self.log_file = None
+
+
+def print_tail(server):
+    """Print the last lines a server wrote, to explain why it failed."""
+    lines = server['output'].tail()
+    if not lines:
+        log(f"(no output from server on port {server['port']})")
+        return
+    log(
+        f"--- Last {len(lines)} line(s) from server on port {server['port']} ---\n"
+        + '\n'.join(lines)
+        + "\n---"
+    )
+
+
+def parse_readiness(specs, ports):
+    """Parse 'PORT:tcp', 'PORT:http:/path[=STATUS]' and 'PORT:log:REGEX' specs.
+
+    Returns {port: check}, defaulting to a TCP connect for ports without a spec.
+    """
+    checks = {port: {'kind': 'tcp'} for port in ports}
+    for spec in specs or []:
+        port, _, check = spec.partition(':')
+        kind, _, arg = check.partition(':')
         try:
-            with socket.create_connection(('localhost', port), timeout=1):
+            port = int(port)
+        except ValueError:
+            raise ValueError(f"Invalid --ready '{spec}', expected PORT:tcp, PORT:http:/path[=STATUS] or PORT:log:REGEX")
+        if port not in checks:
+            raise ValueError(f"--ready '{spec}' refers to port {port}, which has no --server")
+
+        if kind == 'tcp' and not arg:
+            checks[port] = {'kind': 'tcp'}
+        elif kind == 'http':
+            path, _, status = arg.partition('=')
+            if not path.startswith('/') or (status and not status.isdigit()):
+                raise ValueError(f"Invalid --ready '{spec}', expected PORT:http:/path[=STATUS]")
+            checks[port] = {'kind': 'http', 'path': path, 'status': int(status or 200)}
+        elif kind == 'log' and arg:
+            try:
+                checks[port] = {'kind': 'log', 'pattern': re.compile(arg)}
+            except re.error as e:
+                raise ValueError(f"Invalid regex in --ready '{spec}': {e}")
+        else:
+            raise ValueError(f"Invalid --ready '{spec}', expected PORT:tcp, PORT:http:/path[=STATUS] or PORT:log:REGEX")
+    return checks
+
+
+def describe_readiness(check):
+    if check['kind'] == 'http':
+        return f"HTTP {check['status']} from {check['path']}"
+    if check['kind'] == 'log':
+        return f"log line matching /{check['pattern'].pattern}/"
+    return 'TCP connect'
+
+
+def probe_tcp(port, timeout):
+    try:
+        with socket.create_connection(('localhost', port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def probe_http(port, path, status, timeout):
+    connection = http.client.HTTPConnection('localhost', port, timeout=timeout)
+    try:
+        connection.request('GET', path)
+        return connection.getresponse().status == status
+    except (OSError, http.client.HTTPException):
+        return False
+    finally:
+        connection.close()
+
+
+def wait_until_ready(server, process, timeout=30, abort=None):
+    """Wait until the server passes its readiness check.
+
+    Probes start INITIAL_POLL_INTERVAL apart and back off exponentially to
+    MAX_POLL_INTERVAL; log checks wake as soon as the line arrives. Raises
+    RuntimeError as soon as the server process exits, or once ``timeout``
+    passes. Returns False early if the optional ``abort`` event is set.
+    """
+    check = server['ready']
+    deadline = time.time() + timeout
+    interval = INITIAL_POLL_INTERVAL
+    while True:
+        if abort is not None and abort.is_set():
+            return False
+        if process.poll() is not None:
+            raise RuntimeError(
+                f"Server on port {server['port']} exited with code {process.returncode} before becoming ready"
+            )
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise RuntimeError(
+                f"Server failed to start on port {server['port']} within {timeout}s "
+                f"(waiting for {describe_readiness(check)})"
+            )
+
+        if check['kind'] == 'log':
+            if server['output'].matched.wait(timeout=min(interval, remaining)):
+                return True
+        else:
+            probe_timeout = min(1, remaining)
+            if check['kind'] == 'http':
+                ok = probe_http(server['port'], check['path'], check['status'], probe_timeout)
+            else:
+                ok = probe_tcp(server['port'], probe_timeout)
+            if ok:
                 return True
-        except (socket.error, ConnectionRefusedError):
-            time.sleep(0.5)
-    return False
+            time.sleep(min(interval, max(0, deadline - time.time())))
+        interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+
+def parse_dependencies(specs, ports):
+    """Parse 'PORT:DEP_PORT[,DEP_PORT...]' specs into {port: [dep_port, ...]}."""
+    depends_on = {port: [] for port in ports}
+    for spec in specs or []:
+        try:
+            port, deps = spec.split(':', 1)
+            port = int(port)
+            deps = [int(dep) for dep in deps.split(',') if dep]
+        except ValueError:
+            raise ValueError(f"Invalid --depends-on '{spec}', expected PORT:DEP_PORT[,DEP_PORT...]")
+        for p in [port, *deps]:
+            if p not in depends_on:
+                raise ValueError(f"--depends-on '{spec}' refers to port {p}, which has no --server")
+        depends_on[port].extend(deps)
+
+    # Reject cycles, which would make servers wait on each other forever
+    visiting, done = set(), set()
+
+    def visit(port):
+        if port in done:
+            return
+        if port in visiting:
+            raise ValueError(f"--depends-on has a cycle through port {port}")
+        visiting.add(port)
+        for dep in depends_on[port]:
+            visit(dep)
+        visiting.discard(port)
+        done.add(port)
+
+    for port in depends_on:
+        visit(port)
+    return depends_on
+
+
+def start_servers(servers, depends_on, timeout, launch_time, output_options):
+    """Start all servers at once and wait for them concurrently.
+
+    A server with dependencies is only started once every server it depends
+    on is ready. Each server dict gets its 'process' as soon as it starts, so
+    the caller can clean up even if startup fails, an 'output' (ServerOutput
+    built with ``output_options``), plus 'started_at' and 'ready_at' (seconds
+    since ``launch_time``).
+    """
+    ready = {server['port']: threading.Event() for server in servers}
+    abort = threading.Event()
+
+    def start(i, server):
+        for dep in depends_on[server['port']]:
+            while not ready[dep].wait(timeout=0.1):
+                if abort.is_set():
+                    return
+        if abort.is_set():
+            return
+
+        deps = depends_on[server['port']]
+        after = f" (after port{'s' if len(deps) > 1 else ''} {', '.join(map(str, deps))})" if deps else ''
+        log(f"Starting server {i+1}/{len(servers)}{after}: {server['cmd']}")
+
+        # Use shell=True to support commands with cd and &&. The server gets
+        # its own process group so teardown reaches the shell's children too.
+        process = subprocess.Popen(
+            server['cmd'],
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=HAS_PROCESS_GROUPS
+        )
+        server['process'] = process
+        server['started_at'] = time.time() - launch_time
+
+        log_dir = output_options['log_dir']
+        server['output'] = ServerOutput(
+            process,
+            f"{i+1}:{server['port']}",
+            tail_lines=output_options['tail_lines'],
+            stream=output_options['stream'],
+            log_path=os.path.join(log_dir, f"server-{i+1}-port-{server['port']}.log") if log_dir else None,
+            ready_pattern=server['ready'].get('pattern'),
+        )
+
+        log(f"Waiting for server on port {server['port']} ({describe_readiness(server['ready'])})...")
+        try:
+            if not wait_until_ready(server, process, timeout=timeout, abort=abort):
+                return
+        except RuntimeError:
+            if abort.is_set():
+                return
+            abort.set()
+            if not output_options['stream']:
+                print_tail(server)
+            raise
+
+        server['ready_at'] = time.time() - launch_time
+        log(f"Server ready on port {server['port']} ({server['ready_at'] - server['started_at']:.1f}s)")
+        ready[server['port']].set()
+
+    with ThreadPoolExecutor(max_workers=len(servers)) as executor:
+        futures = [executor.submit(start, i, server) for i, server in enumerate(servers)]
+        try:
+            errors = [future.exception() for future in futures if future.exception()]
+        except BaseException:
+            # e.g. Ctrl+C: stop the startup threads so leaving the executor does not wait out --timeout
+            abort.set()
+            raise
+    if errors:
+        raise errors[0]
+
+
+def print_ready_report(servers, launch_time):
+    print(f"\nAll {len(servers)} server(s) ready in {time.time() - launch_time:.1f}s")
+    for i, server in enumerate(servers):
+        print(
+            f"  Server {i+1} (port {server['port']}): ready after {server['ready_at'] - server['started_at']:.1f}s, "
+            f"started at +{server['started_at']:.1f}s, ready at +{server['ready_at']:.1f}s"
+        )
+
+
+def signal_server(process, sig):
+    """Send ``sig`` to the server's whole process group."""
+    try:
+        if HAS_PROCESS_GROUPS:
+            os.killpg(process.pid, sig)
+        elif sig == signal.SIGTERM:
+            process.terminate()
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def group_has_live_members(pgid):
+    """True while a non-zombie process remains in process group ``pgid``.
+
+    Exited grandchildren stay in the group as zombies until init reaps them,
+    so where /proc is available their state is checked rather than relying
+    on killpg(pgid, 0) alone.
+    """
+    if os.path.isdir('/proc'):
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as stat:
+                    # Fields after the parenthesised command: state, ppid, pgrp, ...
+                    fields = stat.read().rsplit(')', 1)[1].split()
+            except (OSError, IndexError):
+                continue
+            if int(fields[2]) == pgid and fields[0] not in ('Z', 'X'):
+                return True
+        return False
+    try:
+        os.killpg(pgid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def server_running(process):
+    """True while any process in the server's group is still alive."""
+    if process.poll() is None:
+        return True
+    return HAS_PROCESS_GROUPS and group_has_live_members(process.pid)
+
+
+def stop_servers(servers, grace=5):
+    """Stop every started server, then close its output.
+
+    All process groups are sent SIGTERM at once and share one ``grace``
+    period; groups still running when it ends are killed.
+    """
+    started = [server for server in servers if 'process' in server]
+    print(f"\nStopping {len(started)} server(s)...")
+    start_time = time.time()
+    for server in started:
+        signal_server(server['process'], signal.SIGTERM)
+
+    deadline = start_time + grace
+    running = started
+    while True:
+        running = [server for server in running if server_running(server['process'])]
+        if not running or time.time() >= deadline:
+            break
+        time.sleep(0.05)
+
+    for server in running:
+        print(f"Server on port {server['port']} still running after {grace}s; killing it")
+        signal_server(server['process'], signal.SIGKILL)
+    for server in started:
+        server['process'].wait()
+        if 'output' in server:
+            server['output'].close()
+    print(
+        f"All servers stopped in {time.time() - start_time:.2f}s"
+        + (f" ({len(running)} killed)" if running else '')
+    )
+
+
+def default_control_path():
+    return os.path.join(tempfile.gettempdir(), 'with_server.sock')
+
+
+def daemon_request(control, request, timeout=5):
+    """Send one request to the daemon; return its reply, or None if no daemon answers."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(control)
+            sock.sendall(json.dumps(request).encode() + b'\n')
+            with sock.makefile('rb') as reply:
+                return json.loads(reply.readline())
+    except (OSError, ValueError):
+        return None
+
+
+def serve_daemon(servers, control, idle_timeout, launch_time):
+    """Keep running servers available behind a control socket until stopped.
+
+    Each attached command holds a connection open while it runs. The daemon
+    exits on a 'stop' request, when a server dies, or after ``idle_timeout``
+    seconds without an attached command (0 disables the idle timeout).
+    """
+    state = {'attached': 0, 'runs': 0, 'last_activity': time.time()}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def status():
+        with lock:
+            return {
+                'ok': True,
+                'pid': os.getpid(),
+                'uptime': time.time() - launch_time,
+                'idle_timeout': idle_timeout,
+                'attached': state['attached'],
+                'runs': state['runs'],
+                'servers': [
+                    {'cmd': server['cmd'], 'port': server['port'], 'alive': server['process'].poll() is None}
+                    for server in servers
+                ],
+            }
+
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, message):
+            self.wfile.write(json.dumps(message).encode() + b'\n')
+            self.wfile.flush()
+
+        def handle(self):
+            try:
+                op = json.loads(self.rfile.readline()).get('op')
+            except ValueError:
+                return
+            if op == 'status':
+                self.reply(status())
+            elif op == 'tail':
+                self.reply({'ok': True, 'tails': {str(server['port']): server['output'].tail() for server in servers}})
+            elif op == 'stop':
+                self.reply({'ok': True})
+                log("Stop requested")
+                stop.set()
+            elif op == 'attach':
+                with lock:
+                    state['attached'] += 1
+                    state['runs'] += 1
+                try:
+                    self.reply(status())
+                    # The client keeps the connection open while its command runs
+                    self.rfile.read()
+                finally:
+                    with lock:
+                        state['attached'] -= 1
+                        state['last_activity'] = time.time()
+            else:
+                self.reply({'ok': False, 'error': f"Unknown op {op!r}"})
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    if os.path.exists(control):
+        os.unlink(control)
+    server = Server(control, Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log(f"Daemon listening on {control} (idle timeout: {f'{idle_timeout}s' if idle_timeout else 'none'})")
+
+    try:
+        while not stop.wait(timeout=0.5):
+            dead = [s for s in servers if s['process'].poll() is not None]
+            if dead:
+                for s in dead:
+                    log(f"Server on port {s['port']} exited with code {s['process'].returncode}")
+                    print_tail(s)
+                break
+            with lock:
+                idle = time.time() - state['last_activity'] if state['attached'] == 0 else 0
+            if idle_timeout and idle > idle_timeout:
+                log(f"Idle for {idle:.0f}s, shutting down")
+                break
+    finally:
+        # The socket file itself is removed once the servers are stopped
+        server.shutdown()
+        server.server_close()
+
+
+def spawn_daemon(args, control):
+    """Start this script as a detached daemon and wait until its servers are ready."""
+    argv = [sys.executable, os.path.abspath(__file__), '--daemon-child', '--control', control]
+    for cmd, port in zip(args.servers, args.ports):
+        argv += ['--server', cmd, '--port', str(port)]
+    for spec in args.depends_on or []:
+        argv += ['--depends-on', spec]
+    for spec in args.ready or []:
+        argv += ['--ready', spec]
+    argv += [
+        '--timeout', str(args.timeout),
+        '--tail-lines', str(args.tail_lines),
+        '--idle-timeout', str(args.idle_timeout),
+        '--shutdown-grace', str(args.shutdown_grace),
+    ]
+    if args.stream_logs:
+        argv.append('--stream-logs')
+    if args.log_dir:
+        argv += ['--log-dir', args.log_dir]
+
+    daemon_log = control + '.log'
+    print(f"Starting server daemon (log: {daemon_log})...")
+    with open(daemon_log, 'w') as log_file:
+        process = subprocess.Popen(argv, stdin=subprocess.DEVNULL, stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True)
+
+    # Dependencies may chain, so allow every server its full timeout
+    deadline = time.time() + args.timeout * len(args.servers) + 5
+    interval = INITIAL_POLL_INTERVAL
+    while time.time() < deadline:
+        if process.poll() is not None:
+            break
+        status = daemon_request(control, {'op': 'status'})
+        if status:
+            return status
+        time.sleep(interval)
+        interval = min(interval * 2, MAX_POLL_INTERVAL)
+    else:
+        process.kill()
+
+    with open(daemon_log, errors='replace') as log_file:
+        lines = log_file.read().splitlines()[-args.tail_lines:] if args.tail_lines else []
+    print("Error: Server daemon failed to start" + (":\n" + '\n'.join(lines) if lines else ''))
+    return None
+
+
+def build_jobs(command, extra_commands, shards):
+    """Expand the command(s) to run into jobs, one per command and shard.
+
+    ``command`` is an argv list and each of ``extra_commands`` a shell string.
+    With more than one shard, every job gets SHARD_INDEX (0-based) and
+    SHARD_COUNT in its environment, and {shard_index}, {shard_number}
+    (1-based) and {shard_count} in the command are replaced.
+    """
+    commands = ([command] if command else []) + list(extra_commands or [])
+    jobs = []
+    for n, cmd in enumerate(commands):
+        for shard in range(shards):
+            label = f"cmd {n+1}" if len(commands) > 1 else ''
+            env = None
+            if shards > 1:
+                label = f"{label} shard {shard+1}/{shards}".strip()
+                env = {**os.environ, 'SHARD_INDEX': str(shard), 'SHARD_COUNT': str(shards)}
+
+                def fill(text, shard=shard):
+                    return (
+                        text.replace('{shard_index}', str(shard))
+                        .replace('{shard_number}', str(shard + 1))
+                        .replace('{shard_count}', str(shards))
+                    )
+
+                cmd_for_shard = fill(cmd) if isinstance(cmd, str) else [fill(arg) for arg in cmd]
+            else:
+                cmd_for_shard = cmd
+            jobs.append({'label': label or 'cmd', 'cmd': cmd_for_shard, 'env': env})
+    return jobs
+
+
+def run_jobs(jobs):
+    """Run all jobs concurrently and return the overall exit code.
+
+    A single job inherits the terminal. With several jobs, each one's output
+    is prefixed with its label, and a summary of exit codes and durations
+    is printed at the end. The overall exit code is the first non-zero one
+    in job order, or 0.
+    """
+    def describe(cmd):
+        return cmd if isinstance(cmd, str) else ' '.join(cmd)
+
+    if len(jobs) == 1:
+        job = jobs[0]
+        print(f"Running: {describe(job['cmd'])}\n")
+        return subprocess.run(job['cmd'], shell=isinstance(job['cmd'], str), env=job['env']).returncode
+
+    def run(job):
+        log(f"[{job['label']}] Running: {describe(job['cmd'])}")
+        start_time = time.time()
+        process = subprocess.Popen(
+            job['cmd'],
+            shell=isinstance(job['cmd'], str),
+            env=job['env'],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        for raw in iter(lambda: process.stdout.readline(MAX_LINE_BYTES), b''):
+            log(f"[{job['label']}] {raw.decode(errors='replace').rstrip()}")
+        process.stdout.close()
+        job['returncode'] = process.wait()
+        job['duration'] = time.time() - start_time
+
+    print(f"Running {len(jobs)} jobs concurrently\n")
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        list(executor.map(run, jobs))
+    wall_time = time.time() - start_time
+
+    failed = [job for job in jobs if job['returncode'] != 0]
+    print(
+        f"\n{len(jobs) - len(failed)}/{len(jobs)} jobs passed in {wall_time:.1f}s "
+        f"({sum(job['duration'] for job in jobs):.1f}s of job time)"
+    )
+    for job in jobs:
+        status = 'ok' if job['returncode'] == 0 else f"FAILED (exit {job['returncode']})"
+        print(f"  {job['label']}: {status} in {job['duration']:.1f}s")
+    return failed[0]['returncode'] if failed else 0
+
+
+def run_attached(jobs, control, tail_lines):
+    """Run jobs against the servers of a running daemon."""
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(control)
+        sock.sendall(json.dumps({'op': 'attach'}).encode() + b'\n')
+        status = json.loads(sock.makefile('rb').readline())
+    except (OSError, ValueError):
+        print(f"Error: No server daemon is running on {control}")
+        return 1
+
+    with sock:
+        dead = [server['port'] for server in status['servers'] if not server['alive']]
+        if dead:
+            print(f"Error: Daemon server(s) on port(s) {', '.join(map(str, dead))} have exited")
+            return 1
+        ports = ', '.join(str(server['port']) for server in status['servers'])
+        print(f"Attached to server daemon (pid {status['pid']}, up {status['uptime']:.0f}s) on port(s) {ports}")
+        returncode = run_jobs(jobs)
+
+    if returncode != 0 and tail_lines:
+        reply = daemon_request(control, {'op': 'tail'})
+        if reply:
+            print(f"\nCommand exited with code {returncode}; recent server output:")
+            for port, lines in reply['tails'].items():
+                lines = lines[-tail_lines:]
+                print(f"--- Last {len(lines)} line(s) from server on port {port} ---\n" + '\n'.join(lines) + "\n---")
+    return returncode
 
 
 def main():
     parser = argparse.ArgumentParser(description='Run command with one or more servers')
-    parser.add_argument('--server', action='append', dest='servers', required=True, help='Server command (can be repeated)')
-    parser.add_argument('--port', action='append', dest='ports', type=int, required=True, help='Port for each server (must match --server count)')
+    parser.add_argument('--server', action='append', dest='servers', default=[], help='Server command (can be repeated)')
+    parser.add_argument('--port', action='append', dest='ports', type=int, default=[], help='Port for each server (must match --server count)')
     parser.add_argument('--timeout', type=int, default=30, help='Timeout in seconds per server (default: 30)')
+    parser.add_argument('--depends-on', action='append', metavar='PORT:DEP_PORT', help="Start the server on PORT only after the server(s) on DEP_PORT are ready, e.g. 5173:3000 (can be repeated)")
+    parser.add_argument('--ready', action='append', metavar='PORT:CHECK', help="Readiness check for the server on PORT: tcp (default), http:/path[=STATUS] (default status 200) or log:REGEX (can be repeated)")
+    parser.add_argument('--stream-logs', action='store_true', help='Echo server output as it arrives, prefixed with [server:port]')
+    parser.add_argument('--log-dir', help='Also write each server\'s output to DIR/server-<n>-port-<port>.log')
+    parser.add_argument('--tail-lines', type=int, default=50, help='Lines of server output to show when a server or the command fails (default: 50)')
+    parser.add_argument('--shutdown-grace', type=float, default=5, help='Seconds servers get to exit after SIGTERM before they are killed (default: 5)')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--daemon', action='store_true', help='Keep the servers running in the background (reusing a running daemon) and run the command, if any, against them')
+    mode.add_argument('--attach', action='store_true', help='Run the command against the servers of a running daemon')
+    mode.add_argument('--stop', action='store_true', help='Stop a running daemon and its servers, waiting up to --shutdown-grace plus 10s')
+    mode.add_argument('--daemon-child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--control', default=default_control_path(), help=f'Control socket of the daemon (default: {default_control_path()})')
+    parser.add_argument('--idle-timeout', type=int, default=1800, help='Stop the daemon after this many seconds without an attached command; 0 to disable (default: 1800)')
+    parser.add_argument('--run', action='append', metavar='CMD', help='Additional shell command to run concurrently with the others (can be repeated)')
+    parser.add_argument('--shards', type=int, default=1, help='Run each command this many times concurrently, with SHARD_INDEX and SHARD_COUNT set (default: 1)')
     parser.add_argument('command', nargs=argparse.REMAINDER, help='Command to run after server(s) ready')
 
     args = parser.parse_args()
@@ -45,62 +736,116 @@ def main():
     if args.command and args.command[0] == '--':
         args.command = args.command[1:]
 
-    if not args.command:
+    if args.shards < 1:
+        print("Error: --shards must be at least 1")
+        sys.exit(1)
+    jobs = build_jobs(args.command, args.run, args.shards)
+
+    if args.stop:
+        if daemon_request(args.control, {'op': 'stop'}) is None:
+            print(f"No server daemon is running on {args.control}")
+            sys.exit(1)
+        # The daemon removes its socket once its servers have stopped
+        deadline = time.time() + args.shutdown_grace + STOP_MARGIN
+        while os.path.exists(args.control):
+            if time.time() > deadline:
+                print(f"Error: Server daemon on {args.control} did not stop within {args.shutdown_grace + STOP_MARGIN:.0f}s")
+                sys.exit(1)
+            time.sleep(0.1)
+        print("Server daemon stopped")
+        sys.exit(0)
+
+    if args.attach:
+        if not jobs:
+            print("Error: No command specified to run")
+            sys.exit(1)
+        sys.exit(run_attached(jobs, args.control, args.tail_lines))
+
+    if not jobs and not (args.daemon or args.daemon_child):
         print("Error: No command specified to run")
         sys.exit(1)
 
     # Parse server configurations
+    if not args.servers:
+        print("Error: At least one --server and --port is required")
+        sys.exit(1)
+
     if len(args.servers) != len(args.ports):
         print("Error: Number of --server and --port arguments must match")
         sys.exit(1)
 
+    if len(set(args.ports)) != len(args.ports):
+        print("Error: Each --port must be unique")
+        sys.exit(1)
+
+    try:
+        depends_on = parse_dependencies(args.depends_on, args.ports)
+        readiness = parse_readiness(args.ready, args.ports)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.tail_lines < 0:
+        print("Error: --tail-lines must be 0 or more")
+        sys.exit(1)
+
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok=True)
+
+    if args.daemon:
+        status = daemon_request(args.control, {'op': 'status'})
+        if status:
+            running = [(server['cmd'], server['port']) for server in status['servers']]
+            if running != list(zip(args.servers, args.ports)):
+                print(f"Error: A server daemon with different servers is running on {args.control}; stop it with --stop first")
+                sys.exit(1)
+            print(f"Reusing server daemon (pid {status['pid']}, up {status['uptime']:.0f}s)")
+        else:
+            status = spawn_daemon(args, args.control)
+            if status is None:
+                sys.exit(1)
+            print(f"Server daemon ready (pid {status['pid']}); stop it with: python {sys.argv[0]} --stop"
+                  + (f" --control {args.control}" if args.control != default_control_path() else ''))
+        if jobs:
+            sys.exit(run_attached(jobs, args.control, args.tail_lines))
+        sys.exit(0)
+
     servers = []
     for cmd, port in zip(args.servers, args.ports):
-        servers.append({'cmd': cmd, 'port': port})
+        servers.append({'cmd': cmd, 'port': port, 'ready': readiness[port]})
 
-    server_processes = []
+    output_options = {'stream': args.stream_logs, 'log_dir': args.log_dir, 'tail_lines': args.tail_lines}
 
-    try:
-        # Start all servers
-        for i, server in enumerate(servers):
-            print(f"Starting server {i+1}/{len(servers)}: {server['cmd']}")
-
-            # Use shell=True to support commands with cd and &&
-            process = subprocess.Popen(
-                server['cmd'],
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            server_processes.append(process)
-
-            # Wait for this server to be ready
-            print(f"Waiting for server on port {server['port']}...")
-            if not is_server_ready(server['port'], timeout=args.timeout):
-                raise RuntimeError(f"Server failed to start on port {server['port']} within {args.timeout}s")
+    # Servers run in their own process groups and no longer see the terminal's
+    # signals, so make SIGTERM run the cleanup below instead of orphaning them
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+    launch_time = time.time()
 
-            print(f"Server ready on port {server['port']}")
+    try:
+        # Start all servers, waiting for their readiness concurrently
+        start_servers(servers, depends_on, args.timeout, launch_time, output_options)
+        print_ready_report(servers, launch_time)
 
-        print(f"\nAll {len(servers)} server(s) ready")
+        if args.daemon_child:
+            serve_daemon(servers, args.control, args.idle_timeout, launch_time)
+            return
 
-        # Run the command
-        print(f"Running: {' '.join(args.command)}\n")
-        result = subprocess.run(args.command)
-        sys.exit(result.returncode)
+        # Run the command(s)
+        returncode = run_jobs(jobs)
+        if returncode != 0 and args.tail_lines and not args.stream_logs:
+            print(f"\nCommand exited with code {returncode}; recent server output:")
+            for server in servers:
+                print_tail(server)
+        sys.exit(returncode)
 
     finally:
         # Clean up all servers
-        print(f"\nStopping {len(server_processes)} server(s)...")
-        for i, process in enumerate(server_processes):
-            try:
-                process.terminate()
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                process.kill()
-                process.wait()
-            print(f"Server {i+1} stopped")
-        print("All servers stopped")
+        stop_servers(servers, grace=args.shutdown_grace)
+        if args.daemon_child and os.path.exists(args.control):
+            os.unlink(args.control)
+        if args.log_dir:
+            print(f"Server logs written to {args.log_dir}")
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()